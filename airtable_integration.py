@@ -5,7 +5,33 @@ Automates lead capture, affiliate tracking, and email generation
 
 import requests
 import json
+import orjson
+import atexit
+import string
+import threading
+import logging
+from collections import Counter
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Airtable accepts at most 10 records per create request
+BATCH_SIZE = 10
+# Seconds a partial batch may wait before it is sent anyway
+FLUSH_INTERVAL = 2.0
+# Airtable's maximum page size for list requests
+PAGE_SIZE = 100
+# Times a failed batch is sent before its records are dropped (and logged)
+MAX_ATTEMPTS = 3
+
+# Options of the Network / Recommended_Network single-select fields
+NETWORKS = ('Orange', 'Mascom', 'BTC')
+
+log = logging.getLogger(__name__)
+
+def _select(value, options):
+    """A single-select value Airtable will accept, or None (blank) if it isn't one of the options"""
+    return value if value in options else None
 
 class AirtableAutomation:
     """
@@ -13,6 +39,44 @@ class AirtableAutomation:
     This replaces traditional SQL databases with Basha's preferred Airtable approach
     """
     
+    # Follow-up email, built once at import - generate_email only fills the blanks
+    NETWORK_BULLETS = {
+        'Mascom': "✅ **Best Pricing**: Mascom offers the most affordable data packages, perfect for budget-conscious users.",
+        'Orange': "✅ **Fastest Speed**: Orange has the fastest 4G/5G network in Botswana, ideal for streaming and downloads.",
+        'BTC': "✅ **Best Service**: BTC has the highest customer satisfaction ratings (8.07/10).",
+    }
+    
+    EMAIL_TEMPLATE = string.Template("""Subject: Your Perfect Network Match: $network 🎯
+
+Hi $name!
+
+Thanks for using our Network Comparison Tool! Based on your answers, we found that **$network** is your best match.
+
+Here's why $network is perfect for you:
+
+$bullet
+
+**Your Next Steps:**
+
+1. **Visit $network**: [INSERT AFFILIATE LINK]
+2. **Ask for**: Student/Corporate discount if applicable
+3. **Mention**: Network comparison tool (they may have special offers!)
+
+**Quick Comparison:**
+- Overall Rating: [INSERT SCORE]/10
+- Customer Service: [INSERT SCORE]/10
+- Pricing: [INSERT SCORE]/10
+
+Have questions? Just reply to this email - we're here to help!
+
+Cheers,
+Botswana Network Comparison Team
+
+P.S. Save P50-P200/month by switching to the right network! 💰
+
+---
+[Unsubscribe] | [Update Preferences]""")
+    
     def __init__(self, api_key, base_id):
         """
         Initialize Airtable connection
@@ -28,6 +92,22 @@ class AirtableAutomation:
             'Content-Type': 'application/json'
         }
         self.base_url = f'https://api.airtable.com/v0/{base_id}'
+        self.urls = {table: f'{self.base_url}/{table}' for table in ('LEADS', 'CLICKS', 'REVIEWS')}
+        
+        # One keep-alive session for every call (saves a TLS handshake per request)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        ))
+        
+        # Write buffers - records are POSTed in batches instead of one call each
+        self._buffers = {'LEADS': [], 'CLICKS': [], 'REVIEWS': []}
+        self._lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush)
     
     def create_base_tables(self):
         """
@@ -80,35 +160,28 @@ class AirtableAutomation:
     def add_lead(self, lead_data):
         """
         Capture a new lead and auto-generate follow-up email
+        The record is buffered and sent with the next batch (see flush);
+        the email draft is generated then too, off the caller's path
         
         Args:
             lead_data: dict with email, name, network, priority, usage, location
         """
-        # Generate AI email based on lead data
-        ai_email = self.generate_email(lead_data)
-        
-        # Prepare Airtable record
+        # Prepare Airtable record (AI_Email_Draft is added in _post_batch)
         record = {
             "fields": {
                 "Email": lead_data.get('email'),
                 "Name": lead_data.get('name', ''),
-                "Recommended_Network": lead_data.get('network'),
+                # Anything else (e.g. the newsletter's 'N/A') is left blank, not added as a new option
+                "Recommended_Network": _select(lead_data.get('network'), NETWORKS),
                 "Priority": lead_data.get('priority'),
                 "Usage_Type": lead_data.get('usage'),
                 "Location": lead_data.get('location'),
-                "Status": "New",
-                "AI_Email_Draft": ai_email
+                "Status": "New"
             }
         }
         
-        # POST to Airtable
-        response = requests.post(
-            f"{self.base_url}/LEADS",
-            headers=self.headers,
-            json={"records": [record]}
-        )
-        
-        return response.json()
+        # Queue for the next batched POST to Airtable
+        return self._enqueue('LEADS', record)
     
     def generate_email(self, lead_data):
         """
@@ -117,44 +190,12 @@ class AirtableAutomation:
         """
         network = lead_data.get('network')
         name = lead_data.get('name', 'there')
-        priority = lead_data.get('priority')
-        
-        email_template = f"""
-Subject: Your Perfect Network Match: {network} 🎯
-
-Hi {name}!
-
-Thanks for using our Network Comparison Tool! Based on your answers, we found that **{network}** is your best match.
-
-Here's why {network} is perfect for you:
-
-{"✅ **Best Pricing**: Mascom offers the most affordable data packages, perfect for budget-conscious users." if network == "Mascom" else ""}
-{"✅ **Fastest Speed**: Orange has the fastest 4G/5G network in Botswana, ideal for streaming and downloads." if network == "Orange" else ""}
-{"✅ **Best Service**: BTC has the highest customer satisfaction ratings (8.07/10)." if network == "BTC" else ""}
-
-**Your Next Steps:**
-
-1. **Visit {network}**: [INSERT AFFILIATE LINK]
-2. **Ask for**: Student/Corporate discount if applicable
-3. **Mention**: Network comparison tool (they may have special offers!)
-
-**Quick Comparison:**
-- Overall Rating: [INSERT SCORE]/10
-- Customer Service: [INSERT SCORE]/10
-- Pricing: [INSERT SCORE]/10
-
-Have questions? Just reply to this email - we're here to help!
-
-Cheers,
-Botswana Network Comparison Team
-
-P.S. Save P50-P200/month by switching to the right network! 💰
-
----
-[Unsubscribe] | [Update Preferences]
-        """
         
-        return email_template.strip()
+        return self.EMAIL_TEMPLATE.substitute(
+            network=network,
+            name=name,
+            bullet=self.NETWORK_BULLETS.get(network, '')
+        )
     
     def track_click(self, click_data):
         """
@@ -165,20 +206,14 @@ P.S. Save P50-P200/month by switching to the right network! 💰
         """
         record = {
             "fields": {
-                "Network": click_data.get('network'),
+                "Network": _select(click_data.get('network'), NETWORKS),
                 "Action": click_data.get('action'),
                 "Session_ID": click_data.get('session_id'),
                 "Converted": False
             }
         }
         
-        response = requests.post(
-            f"{self.base_url}/CLICKS",
-            headers=self.headers,
-            json={"records": [record]}
-        )
-        
-        return response.json()
+        return self._enqueue('CLICKS', record)
     
     def add_review(self, review_data):
         """
@@ -189,7 +224,7 @@ P.S. Save P50-P200/month by switching to the right network! 💰
         """
         record = {
             "fields": {
-                "Network": review_data.get('network'),
+                "Network": _select(review_data.get('network'), NETWORKS),
                 "Rating": review_data.get('rating'),
                 "Comment": review_data.get('comment'),
                 "User_Email": review_data.get('email'),
@@ -197,13 +232,120 @@ P.S. Save P50-P200/month by switching to the right network! 💰
             }
         }
         
-        response = requests.post(
-            f"{self.base_url}/REVIEWS",
-            headers=self.headers,
-            json={"records": [record]}
-        )
+        return self._enqueue('REVIEWS', record)
+    
+    def batch_create(self, table_to_records):
+        """
+        Queue records for several tables in one call (e.g. a lead and its click)
+        They are sent together on the next flush - one POST per table
         
-        return response.json()
+        Args:
+            table_to_records: dict like {'LEADS': [lead_data], 'CLICKS': [click_data]}
+        """
+        add = {'LEADS': self.add_lead, 'CLICKS': self.track_click, 'REVIEWS': self.add_review}
+        return [add[table](data) for table, items in table_to_records.items() for data in items]
+    
+    def _enqueue(self, table, record):
+        """
+        Buffer a record for the given table
+        Sends a full batch straight away, otherwise a timer flushes it shortly
+        """
+        batch = None
+        with self._lock:
+            buffer = self._buffers[table]
+            buffer.append(record)
+            if len(buffer) >= BATCH_SIZE:
+                batch = buffer[:BATCH_SIZE]
+                del buffer[:BATCH_SIZE]
+            else:
+                self._schedule_flush()
+        
+        if batch:
+            return self._post_batch(table, batch)
+        return None
+    
+    def _schedule_flush(self):
+        """Start the flush timer if it isn't already running (caller holds self._lock)"""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _requeue(self, table, records):
+        """Put a failed batch back at the front of its buffer, unless it has used up its attempts"""
+        retry = []
+        for record in records:
+            record['_attempts'] = record.get('_attempts', 0) + 1
+            if record['_attempts'] < MAX_ATTEMPTS:
+                retry.append(record)
+            else:
+                fields = {k: v for k, v in record['fields'].items() if k != 'AI_Email_Draft'}
+                log.error("Dropping %s record after %d failed attempts: %s", table, MAX_ATTEMPTS, fields)
+        
+        if retry:
+            with self._lock:
+                self._buffers[table][:0] = retry
+                self._schedule_flush()
+    
+    def _post_batch(self, table, records):
+        """Create up to BATCH_SIZE records in a single POST"""
+        if table == 'LEADS':
+            # Generate AI email based on lead data, right before it is sent
+            for record in records:
+                fields = record['fields']
+                fields.setdefault('AI_Email_Draft', self.generate_email({
+                    'network': fields['Recommended_Network'],
+                    'name': fields['Name'] or 'there'
+                }))
+        
+        payload = {"records": [{"fields": r['fields']} for r in records]}
+        try:
+            response = self.session.post(self.urls[table], data=orjson.dumps(payload))
+        except requests.RequestException as e:
+            # Connection problems and timeouts are worth another try
+            log.warning("Airtable %s batch of %d failed, re-queueing: %s", table, len(records), e)
+            self._requeue(table, records)
+            return None
+        
+        status = response.status_code
+        if status == 429 or status >= 500:
+            log.warning("Airtable %s batch of %d got HTTP %d, re-queueing", table, len(records), status)
+            self._requeue(table, records)
+            return None
+        if status >= 400:
+            # Bad key, missing table, unknown field... sending it again won't help
+            log.error("Airtable %s batch of %d rejected (HTTP %d): %s", table, len(records), status, response.text)
+            if status == 422 and len(records) > 1:
+                # Invalid field value - send the records one by one so only the bad one is lost
+                results = [self._post_batch(table, [record]) for record in records]
+                return {'records': [r for result in results if result for r in result.get('records', [])]}
+            return None
+        
+        try:
+            return response.json()
+        except ValueError:
+            return None  # Created, but the body wasn't JSON - nothing to retry
+    
+    def flush(self):
+        """
+        Send every buffered record now
+        Called by the flush timer and at interpreter exit
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending = {table: buffer[:] for table, buffer in self._buffers.items() if buffer}
+            for buffer in self._buffers.values():
+                buffer.clear()
+        
+        # _post_batch re-queues transient failures and logs rejected records, so nothing drained here is lost silently
+        results = []
+        for table, records in pending.items():
+            for i in range(0, len(records), BATCH_SIZE):
+                results.append(self._post_batch(table, records[i:i + BATCH_SIZE]))
+        
+        return results
     
     def get_pending_emails(self):
         """
@@ -211,14 +353,38 @@ P.S. Save P50-P200/month by switching to the right network! 💰
         Returns leads with Status = "New" and pre-generated AI emails
         """
         formula = "AND({Status}='New', {Email}!=BLANK())"
+        return {'records': list(self._iter_records('LEADS', formula=formula))}
+    
+    def get_pending_emails_since(self, since=None):
+        """
+        Incremental version of get_pending_emails for frequent polling
+        The caller keeps the watermark (the client is shared across sessions);
+        neither app polls leads, so this is for follow-up scripts, e.g.
+
+            result = airtable.get_pending_emails_since(watermark)
+            watermark = result['watermark']
+
+        Args:
+            since: 'watermark' from the previous call, or None for everything
+        
+        Returns:
+            {'records': [...], 'watermark': ...} - records are sorted by Created_Time and
+            include the watermark's own second, so skip record IDs you already handled
+        """
+        formula = "AND({Status}='New', {Email}!=BLANK())"
+        if since:
+            formula = (
+                "AND({Status}='New', {Email}!=BLANK(), "
+                f"NOT(IS_BEFORE({{Created_Time}}, DATETIME_PARSE('{since}'))))"
+            )
         
-        response = requests.get(
-            f"{self.base_url}/LEADS",
-            headers=self.headers,
-            params={'filterByFormula': formula}
-        )
+        records = list(self._iter_records(
+            'LEADS', formula=formula, sort=[('Created_Time', 'asc')]
+        ))
+        # Every page has been read, so the last record really is the newest
+        watermark = records[-1]['fields'].get('Created_Time', since) if records else since
         
-        return response.json()
+        return {'records': records, 'watermark': watermark}
     
     def update_lead_status(self, record_id, new_status):
         """
@@ -234,10 +400,9 @@ P.S. Save P50-P200/month by switching to the right network! 💰
             }
         }
         
-        response = requests.patch(
-            f"{self.base_url}/LEADS/{record_id}",
-            headers=self.headers,
-            json=record
+        response = self.session.patch(
+            f"{self.urls['LEADS']}/{record_id}",
+            data=orjson.dumps(record)
         )
         
         return response.json()
@@ -247,26 +412,53 @@ P.S. Save P50-P200/month by switching to the right network! 💰
         Get stats for business dashboard
         Returns total leads, clicks, conversion rate, etc.
         """
-        # Get all leads
-        leads_response = requests.get(f"{self.base_url}/LEADS", headers=self.headers)
-        leads = leads_response.json().get('records', [])
-        
-        # Get all clicks
-        clicks_response = requests.get(f"{self.base_url}/CLICKS", headers=self.headers)
-        clicks = clicks_response.json().get('records', [])
+        # Only the fields we tally - never download the AI_Email_Draft bodies
+        leads = list(self._iter_records('LEADS', ['Status', 'Recommended_Network']))
+        total_clicks = self._count('CLICKS', 'Network')
         
         stats = {
             'total_leads': len(leads),
-            'total_clicks': len(clicks),
+            'total_clicks': total_clicks,
             'conversion_rate': len([l for l in leads if l['fields'].get('Status') == 'Converted']) / max(len(leads), 1) * 100,
             'popular_network': self._most_common([l['fields'].get('Recommended_Network') for l in leads])
         }
         
         return stats
     
+    def _iter_records(self, table, fields=None, formula=None, sort=None):
+        """
+        Yield every record in a table, following Airtable's offset paging
+        
+        Args:
+            table: Airtable table name
+            fields: optional list of field names to return (keeps pages small)
+            formula: optional filterByFormula expression
+            sort: optional list of (field, 'asc'/'desc') pairs
+        """
+        params = {'pageSize': PAGE_SIZE}
+        if fields:
+            params['fields[]'] = fields
+        if formula:
+            params['filterByFormula'] = formula
+        for i, (field, direction) in enumerate(sort or []):
+            params[f'sort[{i}][field]'] = field
+            params[f'sort[{i}][direction]'] = direction
+        
+        while True:
+            data = self.session.get(self.urls[table], params=params).json()
+            yield from data.get('records', [])
+            if 'offset' not in data:
+                break
+            params['offset'] = data['offset']
+    
+    def _count(self, table, field, formula=None):
+        """Count records (optionally matching a filterByFormula) fetching a single field"""
+        return sum(1 for _ in self._iter_records(table, [field], formula))
+    
     def _most_common(self, lst):
-        """Helper to find most common item in list"""
-        return max(set(lst), key=lst.count) if lst else 'N/A'
+        """Helper to find most common item in list (ignores blanks)"""
+        items = [x for x in lst if x]
+        return Counter(items).most_common(1)[0][0] if items else 'N/A'
 
 
 # ⚠️ EXAMPLE USAGE - FOR TESTING ONLY
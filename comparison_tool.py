@@ -6,14 +6,17 @@ MONETIZATION READY with affiliate tracking
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-import json
+import uuid
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # ✅ IMPORT AIRTABLE INTEGRATION
 from airtable_integration import AirtableAutomation
 
+log = logging.getLogger(__name__)
+
 # Page config
 st.set_page_config(
     page_title="Compare Botswana Networks | Find Your Best Mobile Network",
@@ -23,7 +26,7 @@ st.set_page_config(
 )
 
 # Custom CSS for professional look
-st.markdown("""
+_CSS = """
 <style>
     /* Hide Streamlit branding */
     #MainMenu {visibility: hidden;}
@@ -99,12 +102,59 @@ st.markdown("""
         border-radius: 10px;
         margin: 20px 0;
     }
+    
+    .score-bars {
+        margin-bottom: 1rem;
+    }
+    
+    .score-label {
+        display: flex;
+        justify-content: space-between;
+        font-size: 0.9rem;
+        color: #555;
+    }
+    
+    .score-track {
+        background: #f0f0f0;
+        border-radius: 5px;
+        height: 10px;
+        margin: 4px 0 10px;
+    }
+    
+    .score-fill {
+        height: 100%;
+        border-radius: 5px;
+    }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def inject_css():
+    """Inject the page styles (Streamlit needs the element on every rerun)"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+inject_css()
+
+# Survey columns the comparison tool reads (the rest of the CSV is never parsed)
+RATING_COLS = ['A36A_Experience_overall_experience', 'A36B_Experience_Customer_Service',
+               'A36C_Experience_communication_channels', 'A36D_Experience_pricing']
+SURVEY_DTYPES = {
+    # Low-cardinality text columns - categorical codes make filters/groupby cheap
+    'A5_Primary_Mobile_Network': pd.CategoricalDtype(['Orange', 'Mascom', 'BTC']),
+    'A12_Most_Disliked_Feature': 'category',
+    'A25_Excel_Areas_Primary_Network': 'category',
+    **{col: 'float32' for col in RATING_COLS},  # 0-10 ratings don't need float64
+}
+SURVEY_COLS = [*SURVEY_DTYPES, 'D3_Location_Botswana']
+# Part of the Parquet copy's file name - bump it whenever SURVEY_COLS / SURVEY_DTYPES
+# change so copies written by older code are ignored
+CACHE_VERSION = 1
 
 @st.cache_data
 def load_data():
-    """Load survey data"""
+    """
+    Load survey data (via a Parquet copy of the CSV when it is up to date)
+    Returns (df, data_version) - the version identifies which CSV snapshot df came from
+    """
     # Try multiple possible locations
     possible_paths = [
         'Survey_Responses-Grid_view.csv',
@@ -112,62 +162,185 @@ def load_data():
         '/mnt/user-data/uploads/Survey_Responses-Grid_view.csv',
     ]
     
-    for path in possible_paths:
-        try:
-            df = pd.read_csv(path)
-            break
-        except FileNotFoundError:
+    for path in map(Path, possible_paths):
+        if not path.is_file():
             continue
+        parquet_path = path.with_suffix(f'.comparison.v{CACHE_VERSION}.parquet')
+        df = None
+        if parquet_path.is_file() and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+            try:
+                df = pd.read_parquet(parquet_path)
+            except (OSError, ValueError):
+                pass  # Truncated or unreadable copy - rebuild it from the CSV
+        if df is None:
+            # Only the columns used here, parsed straight into their final dtypes
+            try:
+                df = pd.read_csv(path, engine='pyarrow', usecols=SURVEY_COLS, dtype=SURVEY_DTYPES)
+            except ValueError:
+                # A non-numeric rating cell (pyarrow's ArrowInvalid) - read ratings as text and
+                # coerce the bad cells to NaN, as the old to_numeric pass did
+                df = pd.read_csv(path, engine='pyarrow', usecols=SURVEY_COLS,
+                                 dtype={**SURVEY_DTYPES, **{col: str for col in RATING_COLS}})
+                df[RATING_COLS] = df[RATING_COLS].apply(pd.to_numeric, errors='coerce').astype('float32')
+            # Save a Parquet copy so the next cold start skips CSV parsing
+            try:
+                df.to_parquet(parquet_path)
+            except (OSError, ValueError):
+                pass  # Read-only deploys just keep parsing the CSV
+        break
     else:
         st.error("❌ Could not find Survey_Responses-Grid_view.csv")
         st.stop()
     
-    numeric_cols = ['A36A_Experience_overall_experience', 'A36B_Experience_Customer_Service',
-                   'A36C_Experience_communication_channels', 'A36D_Experience_pricing']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    return df
+    return df, (str(path.resolve()), path.stat().st_mtime_ns)
+
+def _top_value(series):
+    """Most frequent value in a series, or 'N/A' if it has none"""
+    # No sort needed just to read the top entry
+    counts = series.value_counts(sort=False)
+    # Categorical columns also list unused categories with a count of 0
+    if len(counts) == 0 or counts.max() == 0:
+        return 'N/A'
+    top = counts.index[counts == counts.max()]
+    if len(top) == 1:
+        return top[0]
+    # Ties go to the value seen first, as a sorted value_counts() does
+    # (categoricals would otherwise fall back to category order)
+    return series[series.isin(top)].iloc[0]
 
-def get_network_data(df, network, location_filter=None):
-    """Get comprehensive network statistics, optionally filtered by location"""
-    network_df = df[df['A5_Primary_Mobile_Network'] == network]
+def summarize_networks(df):
+    """
+    Per-network statistics in a single groupby pass
+    Returns {network: stats dict}; networks with no rows are left out
+    """
+    grouped = df.groupby('A5_Primary_Mobile_Network', observed=True)
+    
+    summary = grouped.agg(
+        users=('A36A_Experience_overall_experience', 'size'),
+        overall_score=('A36A_Experience_overall_experience', 'mean'),
+        customer_service=('A36B_Experience_Customer_Service', 'mean'),
+        pricing=('A36D_Experience_pricing', 'mean'),
+        communication=('A36C_Experience_communication_channels', 'mean'),
+    )
+    
+    # Split/explode the comma-separated strengths once for the whole frame
+    strengths = df[['A5_Primary_Mobile_Network']].assign(
+        strength=df['A25_Excel_Areas_Primary_Network'].str.split(',')
+    ).explode('strength')
+    strengths['strength'] = strengths['strength'].str.strip()
+    summary['top_strength'] = strengths.groupby('A5_Primary_Mobile_Network', observed=True)['strength'].agg(_top_value)
+    summary['top_weakness'] = grouped['A12_Most_Disliked_Feature'].agg(_top_value)
+    
+    return {network: {'name': network, **row} for network, row in summary.to_dict('index').items()}
+
+@st.cache_data(show_spinner=False)
+def compute_all_networks(_df, data_version, recent_surveys=(), location_filter=None):
+    """
+    Stats for all three networks, cached per location
+    The dataframe isn't hashed: it's the load_data() snapshot identified by
+    data_version plus the surveys added this session, so those are the cache key instead
+    (a session started before a data refresh keeps its own, older version)
+    """
+    df = _df
+    networks = ('Orange', 'Mascom', 'BTC')
+    stats = {}
     
     # Apply location filter if provided
     if location_filter and location_filter not in ["Village/Rural Area (type below)", "Other City (type below)", "— Select —", ""]:
-        # Try exact match first
-        location_match = network_df[network_df['D3_Location_Botswana'].str.contains(
+        location_match = df[df['D3_Location_Botswana'].str.contains(
             location_filter, case=False, na=False
         )]
-        if len(location_match) > 0:
-            network_df = location_match
-    
-    if len(network_df) == 0:
-        return {
-            'name': network,
-            'users': 0,
-            'overall_score': 0,
-            'customer_service': 0,
-            'pricing': 0,
-            'communication': 0,
-            'top_strength': 'N/A',
-            'top_weakness': 'N/A'
-        }
-    
-    return {
-        'name': network,
-        'users': len(network_df),
-        'overall_score': network_df['A36A_Experience_overall_experience'].mean(),
-        'customer_service': network_df['A36B_Experience_Customer_Service'].mean(),
-        'pricing': network_df['A36D_Experience_pricing'].mean(),
-        'communication': network_df['A36C_Experience_communication_channels'].mean(),
-        'top_strength': network_df['A25_Excel_Areas_Primary_Network'].str.split(',').explode().str.strip().value_counts().index[0] if len(network_df) > 0 else 'N/A',
-        'top_weakness': network_df['A12_Most_Disliked_Feature'].value_counts().index[0] if len(network_df) > 0 else 'N/A'
+        stats = summarize_networks(location_match)
+    
+    # Networks with no reviews in this location fall back to their overall stats
+    # (the full-frame groupby only runs when one is actually missing)
+    if not all(n in stats for n in networks):
+        stats = {**summarize_networks(df), **stats}
+    
+    empty = {
+        'users': 0,
+        'overall_score': 0,
+        'customer_service': 0,
+        'pricing': 0,
+        'communication': 0,
+        'top_strength': 'N/A',
+        'top_weakness': 'N/A'
     }
+    return {n: stats.get(n, {'name': n, **empty}) for n in networks}
+
+# Quiz priority (emoji stripped) → (recommended network, reason)
+_REC_TABLE = {
+    'Best Price': ('Mascom', "Most affordable data packages according to our user reviews"),
+    'Fastest Internet': ('Orange', "Highest ratings for internet speed and reliability"),
+    'Overall Quality': ('BTC', "Highest overall customer satisfaction (8.07/10)"),
+    'Best Service': ('BTC', "Best customer service ratings (8.02/10)"),
+}
+
+@lru_cache(maxsize=128)
+def recommend(priority):
+    """Quiz recommendation engine - returns (network, reason) for a priority answer"""
+    key = next((k for k in _REC_TABLE if k in priority), 'Best Service')
+    return _REC_TABLE[key]
+
+@st.cache_data
+def build_comparison_df(networks_data):
+    """
+    Comparison table for the three networks, cached on the stats dict
+    Columns stay numeric; display formatting is done by st.dataframe's column_config
+    """
+    columns = {
+        'overall_score': 'Overall Score',
+        'customer_service': 'Customer Service',
+        'pricing': 'Pricing',
+        'users': 'Reviews',
+    }
+    table = pd.DataFrame.from_dict(networks_data, orient='index')[list(columns)].rename(columns=columns)
+    return table.rename_axis('Network').reset_index()
+
+_STRENGTH_BARS = (
+    ('Customer Service', '#667eea'),
+    ('Pricing', '#764ba2'),
+    ('Communication', '#f5576c'),
+)
+
+@lru_cache(maxsize=128)
+def strengths_html(scores):
+    """Score bars for a network card; scores = (service, pricing, communication) rounded to 1dp"""
+    rows = ''.join(
+        f'<div class="score-label">{label} <span>{score:.1f}/10</span></div>'
+        f'<div class="score-track"><div class="score-fill" style="width:{score * 10:.0f}%;background:{color}"></div></div>'
+        for (label, color), score in zip(_STRENGTH_BARS, scores)
+    )
+    return f'<div class="score-bars">{rows}</div>'
+
+class _NullAirtable:
+    """
+    Stand-in client used when Airtable isn't configured
+    Writes are silently dropped, so call sites don't need to check for it;
+    it's falsy so read paths (get_review_count) can still fall back
+    """
+    def __bool__(self):
+        return False
+    
+    def add_lead(self, *args, **kwargs):
+        return None
+    
+    def track_click(self, *args, **kwargs):
+        return None
+    
+    def add_review(self, *args, **kwargs):
+        return None
+    
+    def batch_create(self, *args, **kwargs):
+        return None
 
 # ✅ INITIALIZE AIRTABLE (using Streamlit secrets for security)
+@st.cache_resource
 def init_airtable():
-    """Initialize Airtable connection with error handling"""
+    """
+    Initialize Airtable connection with error handling
+    Cached per server process so every session shares one client (and its connection pool)
+    """
     try:
         # Try to get keys from Streamlit secrets
         if 'airtable' in st.secrets:
@@ -178,10 +351,27 @@ def init_airtable():
         else:
             # Fallback: Show warning if secrets not configured
             st.warning("⚠️ Airtable not configured. Add secrets to enable lead tracking.")
-            return None
+            return _NullAirtable()
     except Exception as e:
         st.warning(f"⚠️ Airtable connection error: {str(e)}")
-        return None
+        return _NullAirtable()
+
+@st.cache_resource
+def get_executor():
+    """Shared worker pool so Airtable writes never block the script thread"""
+    return ThreadPoolExecutor(max_workers=4)
+
+def _log_write_error(future):
+    """Done-callback: surface exceptions raised inside a background Airtable write"""
+    error = future.exception()
+    if error is not None:
+        log.error("Background Airtable write failed: %s", error, exc_info=error)
+
+def submit_write(fn, *args):
+    """Run an Airtable write on the shared pool; failures are logged rather than swallowed"""
+    future = get_executor().submit(fn, *args)
+    future.add_done_callback(_log_write_error)
+    return future
 
 def get_review_count(airtable):
     """
@@ -190,10 +380,8 @@ def get_review_count(airtable):
     """
     if airtable:
         try:
-            import requests
-            r = requests.get(
-                f"{airtable.base_url}/REVIEWS",
-                headers=airtable.headers,
+            r = airtable.session.get(
+                airtable.urls['REVIEWS'],
                 params={'fields[]': 'ID'}
             )
             data = r.json()
@@ -256,17 +444,168 @@ def add_survey_to_session_data(df, survey_data):
     new_df = pd.DataFrame([new_row])
     
     # Make sure numeric columns are numeric
-    for col in ['A36A_Experience_overall_experience', 'A36B_Experience_Customer_Service',
-                'A36C_Experience_communication_channels', 'A36D_Experience_pricing']:
-        new_df[col] = pd.to_numeric(new_df[col], errors='coerce')
+    new_df[RATING_COLS] = new_df[RATING_COLS].apply(pd.to_numeric, errors='coerce').astype('float32')
+    
+    # Keep the network column categorical after the append ("Other / None" has no category)
+    new_df['A5_Primary_Mobile_Network'] = new_df['A5_Primary_Mobile_Network'].astype(
+        df['A5_Primary_Mobile_Network'].dtype
+    )
     
     return pd.concat([df, new_df], ignore_index=True)
 
 
+@st.fragment
+def quiz_results(networks_data, recommended, reason, selected_location, priority, usage, airtable):
+    """
+    Recommendation, email capture and CTA for the quiz
+    Runs as a fragment so typing an email or clicking the CTA doesn't rerun the whole page
+    """
+    # Display recommendation
+    st.success(f"### 🏆 Best Match for You: {recommended}")
+    st.info(f"**Why?** {reason}")
+    
+    # Show network details based on location-specific data
+    rec_data = networks_data[recommended]
+    
+    # ⚠️ Location data warning - THIS IS THE RIGHT SPOT
+    total_location_users = sum([networks_data[n]['users'] for n in ['Orange', 'Mascom', 'BTC']])
+    if total_location_users < 10 and selected_location not in ["Village/Rural Area (type below)", "Other City (type below)", None, ""]:
+        st.warning(f"⚠️ Limited data for **{selected_location}** (only {total_location_users} reviews in this area). Results may improve as more people from your area contribute surveys!")
+    
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Overall Score", f"{rec_data['overall_score']:.1f}/10", "⭐")
+    col2.metric("Customer Service", f"{rec_data['customer_service']:.1f}/10")
+    col3.metric("Pricing", f"{rec_data['pricing']:.1f}/10")
+    col4.metric("Users Reviewed", f"{rec_data['users']:,}")
+    
+    # ✅ EMAIL CAPTURE
+    st.markdown("### 📧 Get Your Personalized Report")
+    st.write("Enter your email to receive detailed comparison and exclusive offers:")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        user_email = st.text_input("Email", placeholder="your@email.com", key="user_email", label_visibility="collapsed")
+    with col2:
+        user_name = st.text_input("Name (optional)", placeholder="Your name", key="user_name", label_visibility="collapsed")
+    
+    # CTA Button with tracking
+    st.markdown("### Ready to switch?")
+    
+    if recommended == 'Orange':
+        affiliate_link = "https://www.orange.co.bw"  # Replace with actual affiliate link
+    elif recommended == 'Mascom':
+        affiliate_link = "https://www.mascom.bw"  # Replace with actual affiliate link
+    else:
+        affiliate_link = "https://www.btc.bw"  # Replace with actual affiliate link
+    
+    if st.button(f"📱 Get {recommended} Now", type="primary", use_container_width=True, key="cta_main"):
+    
+        # ✅ SAVE LEAD TO AIRTABLE (nothing to build when Airtable isn't configured)
+        if airtable and user_email:
+            lead_data = {
+                'email': user_email,
+                'name': user_name if user_name else 'User',
+                'network': recommended,
+                'priority': priority,
+                'usage': usage,
+                'location': selected_location
+            }
+            click_data = {
+                'network': recommended,
+                'action': 'cta_click',
+                'session_id': st.session_state.session_id
+            }
+    
+            try:
+                # Save lead + track the click in one background call (don't block the redirect)
+                submit_write(airtable.batch_create, {'LEADS': [lead_data], 'CLICKS': [click_data]})
+                # Only queued at this point - the write happens in the background
+                st.success("✅ Your details are saved - we'll email your recommendation shortly.")
+    
+            except Exception as e:
+                st.warning(f"Note: {str(e)}")
+    
+        # Redirect to network
+        st.success(f"Opening {recommended} website...")
+        st.markdown(f'<meta http-equiv="refresh" content="2;url={affiliate_link}">', unsafe_allow_html=True)
+
+@st.fragment
+def detailed_cards(networks_data, airtable):
+    """Per-network cards; a fragment so the Choose buttons only rerun the cards"""
+    cols = st.columns(3)
+    
+    # Determine the winner once (ties go to the first network listed)
+    winner = max(networks_data, key=lambda n: networks_data[n]['overall_score'])
+    
+    for idx, (network, data) in enumerate(networks_data.items()):
+        with cols[idx]:
+            if network == winner:
+                st.markdown(f'<span class="winner-badge">🏆 HIGHEST RATED</span>', unsafe_allow_html=True)
+    
+            st.markdown(f"### {network}")
+            st.metric("Overall Rating", f"{data['overall_score']:.2f}/10")
+    
+            # Score bars - one HTML block instead of three progress widgets
+            st.write("**Strengths:**")
+            scores = tuple(round(data[k], 1) for k in ('customer_service', 'pricing', 'communication'))
+            st.markdown(strengths_html(scores), unsafe_allow_html=True)
+    
+            st.write(f"✅ **Best at:** {data['top_strength']}")
+            st.write(f"⚠️ **Watch out:** {data['top_weakness']}")
+    
+            st.write(f"**{data['users']:,}** verified reviews")
+    
+            # ✅ Affiliate CTA button with tracking
+            if st.button(f"Choose {network}", key=f"choose_{network}", use_container_width=True):
+    
+                # Track the click
+                if airtable:
+                    try:
+                        submit_write(airtable.track_click, {
+                            'network': network,
+                            'action': 'detailed_cta',
+                            'session_id': st.session_state.session_id
+                        })
+                    except:
+                        pass
+    
+                st.success(f"Great choice! Redirecting to {network}...")
+
+@st.fragment
+def newsletter_block(airtable):
+    """
+    Footer newsletter signup
+    Runs as a fragment so subscribing doesn't rerun the whole page
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        email = st.text_input("Enter your email", placeholder="your@email.com", label_visibility="collapsed", key="newsletter_email")
+    with col2:
+        if st.button("Subscribe", use_container_width=True, key="newsletter_btn"):
+            if email:
+                # ✅ SAVE TO AIRTABLE
+                try:
+                    # Add as lead with "Newsletter" priority
+                    lead_data = {
+                        'email': email,
+                        'name': 'Newsletter Subscriber',
+                        'network': 'N/A',
+                        'priority': 'Newsletter',
+                        'usage': 'N/A',
+                        'location': 'N/A'
+                    }
+                    submit_write(airtable.add_lead, lead_data)
+                    st.success("Subscribed! ✓")
+                except Exception as e:
+                    st.success("Subscribed! ✓")  # Show success anyway
+            else:
+                st.error("Please enter email")
+
 def main():
     # Initialize session
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        st.session_state.session_id = uuid.uuid4().hex
     if 'survey_completed' not in st.session_state:
         st.session_state.survey_completed = False
     if 'session_new_reviews' not in st.session_state:
@@ -276,8 +615,8 @@ def main():
     airtable = init_airtable()
     
        # Load data
-    if 'df' not in st.session_state:
-        st.session_state.df = load_data()
+    if 'df' not in st.session_state or 'data_version' not in st.session_state:
+        st.session_state.df, st.session_state.data_version = load_data()
     df = st.session_state.df
     
    
@@ -368,20 +707,19 @@ def main():
                     )
                     
                     # Save new review to Airtable
-                    if airtable:
-                        try:
-                            airtable.add_review({
-                                'network': q1_network,
-                                'rating': q2_rating,
-                                'comment': (
-                                    f"Likes: {q3_like} | "
-                                    f"Wants improvement: {q4_improve} | "
-                                    f"Location: {q5_location}"
-                                ),
-                                'email': ''
-                            })
-                        except:
-                            pass  # Don't block the user if Airtable fails
+                    try:
+                        submit_write(airtable.add_review, {
+                            'network': q1_network,
+                            'rating': q2_rating,
+                            'comment': (
+                                f"Likes: {q3_like} | "
+                                f"Wants improvement: {q4_improve} | "
+                                f"Location: {q5_location}"
+                            ),
+                            'email': ''
+                        })
+                    except:
+                        pass  # Don't block the user if Airtable fails
                     
                     new_total = total_reviews + 1
                     st.success(f"🙏 Thank you! Your response will help improve recommendations for **{q5_location}**. You are now part of **{new_total:,}+** Batswana.")
@@ -493,7 +831,16 @@ def main():
         else:
             location = main_location
     
-    if st.button("🔍 Find My Best Match", type="primary", use_container_width=True):
+    find_clicked = st.button("🔍 Find My Best Match", type="primary", use_container_width=True)
+    
+    # Once the user has clicked "Find My Best Match", everything uses their location
+    # Otherwise show general data. Built once per rerun for both sections below.
+    comparison_location = location if find_clicked or 'recommended' in st.session_state else None
+    networks_data = compute_all_networks(
+        df, st.session_state.data_version, st.session_state.get('recent_surveys', []), comparison_location
+    )
+    
+    if find_clicked:
         st.markdown("---")
         
         # Get the selected location for filtering
@@ -502,187 +849,46 @@ def main():
         # Show what location we're analyzing
         st.info(f"📍 Showing results based on data from **{selected_location}**")
         
-        # Simple recommendation logic with location filter
-        networks_data = {
-            'Orange': get_network_data(df, 'Orange', selected_location),
-            'Mascom': get_network_data(df, 'Mascom', selected_location),
-            'BTC': get_network_data(df, 'BTC', selected_location)
-        }
-        
         # Recommendation engine
-        if "Best Price" in priority:
-            recommended = 'Mascom'
-            reason = "Most affordable data packages according to our user reviews"
-        elif "Fastest Internet" in priority:
-            recommended = 'Orange'
-            reason = "Highest ratings for internet speed and reliability"
-        elif "Overall Quality" in priority:
-            recommended = 'BTC'
-            reason = "Highest overall customer satisfaction (8.07/10)"
-        else:
-            recommended = 'BTC'
-            reason = "Best customer service ratings (8.02/10)"
+        recommended, reason = recommend(priority)
         
                 # Store in session state
         st.session_state.recommended = recommended
         st.session_state.reason = reason
         st.session_state.rec_data = networks_data[recommended]
         
-        # Display recommendation
-        st.success(f"### 🏆 Best Match for You: {recommended}")
-        st.info(f"**Why?** {reason}")
-        
-        # Show network details based on location-specific data
-        rec_data = networks_data[recommended]
-        
-        # ⚠️ Location data warning - THIS IS THE RIGHT SPOT
-        total_location_users = sum([networks_data[n]['users'] for n in ['Orange', 'Mascom', 'BTC']])
-        if total_location_users < 10 and selected_location not in ["Village/Rural Area (type below)", "Other City (type below)", None, ""]:
-            st.warning(f"⚠️ Limited data for **{selected_location}** (only {total_location_users} reviews in this area). Results may improve as more people from your area contribute surveys!")
-
-        
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Overall Score", f"{rec_data['overall_score']:.1f}/10", "⭐")
-        col2.metric("Customer Service", f"{rec_data['customer_service']:.1f}/10")
-        col3.metric("Pricing", f"{rec_data['pricing']:.1f}/10")
-        col4.metric("Users Reviewed", f"{rec_data['users']:,}")
-        
-        # ✅ EMAIL CAPTURE
-        st.markdown("### 📧 Get Your Personalized Report")
-        st.write("Enter your email to receive detailed comparison and exclusive offers:")
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            user_email = st.text_input("Email", placeholder="your@email.com", key="user_email", label_visibility="collapsed")
-        with col2:
-            user_name = st.text_input("Name (optional)", placeholder="Your name", key="user_name", label_visibility="collapsed")
-        
-        # CTA Button with tracking
-        st.markdown("### Ready to switch?")
-        
-        if recommended == 'Orange':
-            affiliate_link = "https://www.orange.co.bw"  # Replace with actual affiliate link
-        elif recommended == 'Mascom':
-            affiliate_link = "https://www.mascom.bw"  # Replace with actual affiliate link
-        else:
-            affiliate_link = "https://www.btc.bw"  # Replace with actual affiliate link
-        
-        if st.button(f"📱 Get {recommended} Now", type="primary", use_container_width=True, key="cta_main"):
-            
-            # ✅ SAVE LEAD TO AIRTABLE
-            if airtable and user_email:
-                try:
-                    lead_data = {
-                        'email': user_email,
-                        'name': user_name if user_name else 'User',
-                        'network': recommended,
-                        'priority': priority,
-                        'usage': usage,
-                        'location': location
-                    }
-                    
-                    # Save to Airtable
-                    result = airtable.add_lead(lead_data)
-                    
-                    if result:
-                        st.success("✅ Recommendation sent to your email!")
-                    
-                    # Track the click
-                    airtable.track_click({
-                        'network': recommended,
-                        'action': 'cta_click',
-                        'session_id': st.session_state.session_id
-                    })
-                    
-                except Exception as e:
-                    st.warning(f"Note: {str(e)}")
-            
-            # Redirect to network
-            st.success(f"Opening {recommended} website...")
-            st.markdown(f'<meta http-equiv="refresh" content="2;url={affiliate_link}">', unsafe_allow_html=True)
+        quiz_results(networks_data, recommended, reason, selected_location, priority, usage, airtable)
     
     # Full Comparison Section
     st.markdown("---")
     st.markdown("## 📊 Complete Network Comparison")
     
-    # If user already clicked "Find My Best Match", use the same location
-    # Otherwise show general data
-    if 'recommended' in st.session_state:
-        comparison_location = location
-        st.info(f"📍 Showing comparison for **{comparison_location}**")
-    else:
-        comparison_location = None
-    
-    networks_data = {
-        'Orange': get_network_data(df, 'Orange', comparison_location),
-        'Mascom': get_network_data(df, 'Mascom', comparison_location),
-        'BTC': get_network_data(df, 'BTC', comparison_location)
-    }
-    
     # ⚠️ Location data warning
     if comparison_location is not None:
+        st.info(f"📍 Showing comparison for **{comparison_location}**")
         total_location_users = sum([networks_data[n]['users'] for n in ['Orange', 'Mascom', 'BTC']])
         if total_location_users < 10 and comparison_location not in ["Village/Rural Area (type below)", "Other City (type below)", ""]:
             st.warning(f"⚠️ Limited data for **{comparison_location}** (only {total_location_users} reviews in this area). Results may improve as more people from your area contribute surveys!")
     
     # Create comparison table
-    comparison_df = pd.DataFrame({
-        'Network': ['Orange', 'Mascom', 'BTC'],
-        'Overall Score': [f"{networks_data[n]['overall_score']:.1f}/10" for n in ['Orange', 'Mascom', 'BTC']],
-        'Customer Service': [f"{networks_data[n]['customer_service']:.1f}/10" for n in ['Orange', 'Mascom', 'BTC']],
-        'Pricing': [f"{networks_data[n]['pricing']:.1f}/10" for n in ['Orange', 'Mascom', 'BTC']],
-        'Reviews': [f"{networks_data[n]['users']:,}" for n in ['Orange', 'Mascom', 'BTC']],
-    })
-    
-    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+    comparison_df = build_comparison_df(networks_data)
+    
+    st.dataframe(
+        comparison_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Overall Score': st.column_config.NumberColumn(format='%.1f/10'),
+            'Customer Service': st.column_config.NumberColumn(format='%.1f/10'),
+            'Pricing': st.column_config.NumberColumn(format='%.1f/10'),
+            'Reviews': st.column_config.NumberColumn(format='%d'),
+        }
+    )
     
     # Detailed network cards
     st.markdown("### Detailed Breakdown")
     
-    cols = st.columns(3)
-    
-    for idx, (network, data) in enumerate(networks_data.items()):
-        with cols[idx]:
-            # Determine if winner
-            is_winner = data['overall_score'] == max([d['overall_score'] for d in networks_data.values()])
-            
-            if is_winner:
-                st.markdown(f'<span class="winner-badge">🏆 HIGHEST RATED</span>', unsafe_allow_html=True)
-            
-            st.markdown(f"### {network}")
-            st.metric("Overall Rating", f"{data['overall_score']:.2f}/10")
-            
-            # Progress bars
-            st.write("**Strengths:**")
-            st.progress(data['customer_service']/10)
-            st.caption(f"Customer Service: {data['customer_service']:.1f}/10")
-            
-            st.progress(data['pricing']/10)
-            st.caption(f"Pricing: {data['pricing']:.1f}/10")
-            
-            st.progress(data['communication']/10)
-            st.caption(f"Communication: {data['communication']:.1f}/10")
-            
-            st.write(f"✅ **Best at:** {data['top_strength']}")
-            st.write(f"⚠️ **Watch out:** {data['top_weakness']}")
-            
-            st.write(f"**{data['users']:,}** verified reviews")
-            
-            # ✅ Affiliate CTA button with tracking
-            if st.button(f"Choose {network}", key=f"choose_{network}", use_container_width=True):
-                
-                # Track the click
-                if airtable:
-                    try:
-                        airtable.track_click({
-                            'network': network,
-                            'action': 'detailed_cta',
-                            'session_id': st.session_state.session_id
-                        })
-                    except:
-                        pass
-                
-                st.success(f"Great choice! Redirecting to {network}...")
+    detailed_cards(networks_data, airtable)
     
     # Social proof
     st.markdown("---")
@@ -714,32 +920,7 @@ def main():
     st.markdown("---")
     st.markdown("### 💌 Get Monthly Network Updates")
     
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        email = st.text_input("Enter your email", placeholder="your@email.com", label_visibility="collapsed", key="newsletter_email")
-    with col2:
-        if st.button("Subscribe", use_container_width=True, key="newsletter_btn"):
-            if email:
-                # ✅ SAVE TO AIRTABLE
-                if airtable:
-                    try:
-                        # Add as lead with "Newsletter" priority
-                        lead_data = {
-                            'email': email,
-                            'name': 'Newsletter Subscriber',
-                            'network': 'N/A',
-                            'priority': 'Newsletter',
-                            'usage': 'N/A',
-                            'location': 'N/A'
-                        }
-                        airtable.add_lead(lead_data)
-                        st.success("Subscribed! ✓")
-                    except Exception as e:
-                        st.success("Subscribed! ✓")  # Show success anyway
-                else:
-                    st.success("Subscribed! ✓")
-            else:
-                st.error("Please enter email")
+    newsletter_block(airtable)
 
 if __name__ == "__main__":
     main()
@@ -7,8 +7,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
+from pathlib import Path
+from collections import Counter
+
+# Serialize figures with orjson (in requirements.txt) instead of the stdlib json module
+pio.json.config.default_engine = 'orjson'
 
 # Page config
 st.set_page_config(
@@ -96,9 +102,30 @@ def normalize_location(location):
     return str(location).strip().title()
 
 
+RATING_COLS = ['A36A_Experience_overall_experience', 'A36B_Experience_Customer_Service',
+               'A36C_Experience_communication_channels', 'A36D_Experience_pricing']
+# Every survey column the dashboard reads - the rest of the file is never loaded
+USED_COLS = [
+    'A1_Top_of_Mind_Brand', 'A3_Networks_Stopped_Using', 'A5_Primary_Mobile_Network',
+    'A6_Factors_Influencing_Choice', 'A9_How_Long_Primary_Network', 'A11_Most_Liked_Feature',
+    'A12_Most_Disliked_Feature', 'A22_Desired_Value_Added_Services',
+    'A24_Improvement_Areas_Primary_Network', *RATING_COLS,
+    'D1_Age', 'D3_Location_Botswana', 'D5_Employment_Status', 'D7_Monthly_Income_Allowance',
+]
+CATEGORY_COLS = [
+    'A1_Top_of_Mind_Brand', 'A5_Primary_Mobile_Network', 'A9_How_Long_Primary_Network',
+    'A11_Most_Liked_Feature', 'A12_Most_Disliked_Feature',
+    'D1_Age', 'D3_Location_Botswana', 'D5_Employment_Status', 'D7_Monthly_Income_Allowance',
+]
+# Columns load_data adds on top of the survey answers
+DERIVED_COLS = ['_has_btc_churn']
+# Part of the Parquet copy's file name - bump it whenever load_data's processing
+# (columns, dtypes, cleaning) changes so copies written by older code are ignored
+CACHE_VERSION = 1
+
 @st.cache_data
 def load_data():
-    """Load and process survey data"""
+    """Load and process survey data (via a Parquet copy of the processed CSV when it is up to date)"""
     # Try multiple possible locations
     possible_paths = [
         'Survey_Responses-Grid_view.csv',  # Same folder
@@ -106,666 +133,786 @@ def load_data():
         '/mnt/user-data/uploads/Survey_Responses-Grid_view.csv',  # Cloud/Linux
     ]
     
-    for path in possible_paths:
-        try:
-            df = pd.read_csv(path)
-            print(f"✓ Data loaded from: {path}")
+    for path in map(Path, possible_paths):
+        if path.is_file():
             break
-        except FileNotFoundError:
-            continue
     else:
         st.error("❌ Could not find Survey_Responses-Grid_view.csv. Please ensure it's in the same folder as dashboard.py")
         st.stop()
     
+    parquet_path = path.with_suffix(f'.dashboard.v{CACHE_VERSION}.parquet')
+    if parquet_path.is_file() and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            df = pd.read_parquet(parquet_path, columns=[*USED_COLS, *DERIVED_COLS])
+            print(f"✓ Data loaded from: {parquet_path}")
+            return df
+        except (OSError, ValueError):
+            pass  # Truncated or unreadable copy - rebuild it from the CSV
+    
+    # pyarrow parser, only the used columns, ratings parsed straight to float32
+    try:
+        df = pd.read_csv(path, engine='pyarrow', usecols=USED_COLS, dtype={col: 'float32' for col in RATING_COLS})
+    except ValueError:
+        # A non-numeric rating cell (pyarrow's ArrowInvalid) - read ratings as text and
+        # coerce the bad cells to NaN, as the old to_numeric pass did
+        df = pd.read_csv(path, engine='pyarrow', usecols=USED_COLS, dtype={col: str for col in RATING_COLS})
+        df[RATING_COLS] = df[RATING_COLS].apply(pd.to_numeric, errors='coerce').astype('float32')
+    print(f"✓ Data loaded from: {path}")
+    
     # Normalize city names to avoid duplicates like Gaborone vs Gaborone(UB)
-    if 'D3_Location_Botswana' in df.columns:
-        df['D3_Location_Botswana'] = df['D3_Location_Botswana'].apply(normalize_location)
+    df['D3_Location_Botswana'] = df['D3_Location_Botswana'].apply(normalize_location)
+    
+    # Low-cardinality answers as categoricals - filters and counts work on integer codes
+    df[CATEGORY_COLS] = df[CATEGORY_COLS].astype('category')
     
-    # Convert numeric columns
-    numeric_cols = ['A36A_Experience_overall_experience', 'A36B_Experience_Customer_Service',
-                   'A36C_Experience_communication_channels', 'A36D_Experience_pricing']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Flag BTC leavers once so the Overview metric is just a sum
+    df['_has_btc_churn'] = df['A3_Networks_Stopped_Using'].str.contains('BTC', regex=False, na=False)
+    
+    # Save the processed frame so the next cold start skips parsing and cleaning
+    try:
+        df.to_parquet(parquet_path)
+    except (OSError, ValueError):
+        pass  # Read-only deploys just keep parsing the CSV
     
     return df
 
-def calculate_network_scores(df, network):
-    """Calculate comprehensive scores for a network"""
-    network_data = df[df['A5_Primary_Mobile_Network'] == network]
+@st.cache_data
+def sidebar_options():
+    """Age / income / location choices for the sidebar filters (they only depend on the raw data)"""
+    df = load_data()
+    age_groups = sorted(df['D1_Age'].dropna().unique().tolist())
+    income_levels = df['D7_Monthly_Income_Allowance'].dropna().unique().tolist()
+    locations = sorted(df['D3_Location_Botswana'].dropna().unique().tolist())
+    return age_groups, income_levels, locations
+
+NETWORKS = ['Orange', 'Mascom', 'BTC']
+
+# Charts here are read-only summaries - skip building the Plotly modebar
+PLOTLY_CONFIG = {'displayModeBar': False}
+
+SCORE_COLS = {
+    'A36A_Experience_overall_experience': 'Overall Experience',
+    'A36B_Experience_Customer_Service': 'Customer Service',
+    'A36C_Experience_communication_channels': 'Communication',
+    'A36D_Experience_pricing': 'Pricing',
+}
+
+@st.cache_data(show_spinner=False)
+def compute_all_network_scores(_df, filter_key):
+    """
+    Scores for every network in one groupby pass
+    The filtered frame isn't hashed; filter_key (the sidebar selections) identifies it
+    """
+    grouped = _df.groupby('A5_Primary_Mobile_Network', observed=True)
+    scores = grouped[list(SCORE_COLS)].mean().rename(columns=SCORE_COLS)
+    scores['Users'] = grouped.size()
+    scores = scores.reindex(NETWORKS)
+    scores['Users'] = scores['Users'].fillna(0).astype(int)
+    return scores.to_dict('index')
+
+@st.cache_data(show_spinner=False)
+def top_tokens(series, n):
+    """Top n entries of a comma-separated answer column"""
+    # Respondents pick from a fixed list, so the same answer strings repeat a lot -
+    # split each distinct answer once and weight its tokens by how often it occurs
+    counts = Counter()
+    for answer, occurrences in series.value_counts(sort=False).items():
+        for token in answer.split(','):
+            counts[token.strip()] += occurrences
+    return pd.Series(dict(counts.most_common(n)), dtype='int64')
+
+@st.cache_data(show_spinner=False)
+def network_highlights(_df, filter_key):
+    """
+    Top complaint / want / strength per network as (answer, count), or None
+    One groupby per column for all three networks; keyed like compute_all_network_scores
+    """
+    def top_per_network(networks, answers):
+        counts = pd.DataFrame({'network': networks, 'answer': answers}).dropna().groupby(
+            ['network', 'answer'], observed=True
+        ).size()
+        top = counts.sort_values(ascending=False, kind='stable').groupby(level='network', observed=True).head(1)
+        return {network: (answer, int(count)) for (network, answer), count in top.items()}
+    
+    network = _df['A5_Primary_Mobile_Network']
+    # Explode the comma-separated wants once for the whole frame (index repeats per token)
+    wants = _df['A22_Desired_Value_Added_Services'].str.split(',').explode().str.strip()
     
-    scores = {
-        'Overall Experience': network_data['A36A_Experience_overall_experience'].mean(),
-        'Customer Service': network_data['A36B_Experience_Customer_Service'].mean(),
-        'Communication': network_data['A36C_Experience_communication_channels'].mean(),
-        'Pricing': network_data['A36D_Experience_pricing'].mean(),
-        'Users': len(network_data)
+    tops = {
+        'complaint': top_per_network(network.values, _df['A12_Most_Disliked_Feature'].values),
+        'want': top_per_network(network.loc[wants.index].values, wants.values),
+        'strength': top_per_network(network.values, _df['A11_Most_Liked_Feature'].values),
     }
+    users = network.value_counts()
+    return {n: {'users': int(users.get(n, 0)), **{k: top.get(n) for k, top in tops.items()}} for n in NETWORKS}
+
+def count_values(series, n=None):
+    """
+    value_counts() without the zero-count rows categoricals keep for unused categories
+    With n, only the top n are picked (partial sort) instead of sorting every answer
+    """
+    counts = series.value_counts(sort=False)
+    counts = counts[counts > 0]
+    return counts.nlargest(n) if n else counts.sort_values(ascending=False)
+
+def split_by_network(df):
+    """{network: rows} for the three networks, empty frames for any with no rows"""
+    # One integer-code comparison per network on the categorical column
+    network = df['A5_Primary_Mobile_Network'].cat
+    codes = network.codes.values
+    categories = list(network.categories)
+    masks = {n: codes == categories.index(n) for n in NETWORKS if n in categories}
+    return {n: df.iloc[masks[n]] if n in masks else df.iloc[:0] for n in NETWORKS}
+
+# Figure factories - cached on their (small) count Series, so a rerun that
+# doesn't change a chart's data skips building the Plotly figure.
+# Bars take the Series arrays directly (go.Bar) rather than a rebuilt DataFrame.
+BRAND_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+
+def _cycle(colors, n):
+    """One colour per bar, repeating the palette like Plotly Express does"""
+    return [colors[i % len(colors)] for i in range(n)]
+
+@st.cache_data(show_spinner=False)
+def market_share_fig(market_share, chart_type):
+    """Primary network market share as a pie or bar chart"""
+    if chart_type == "Pie Chart":
+        fig = px.pie(
+            values=market_share.values,
+            names=market_share.index,
+            color_discrete_sequence=BRAND_COLORS,
+            hole=0.4
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    else:
+        fig = go.Figure(go.Bar(
+            x=market_share.index,
+            y=market_share.values,
+            marker_color=_cycle(BRAND_COLORS, len(market_share)),
+            text=market_share.values,
+            textposition='outside'
+        ))
+        fig.update_layout(showlegend=False, xaxis_title="Network", yaxis_title="Number of Users")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def brand_awareness_fig(brand_awareness, chart_type):
+    """Top-of-mind brand mentions as a bar or pie chart"""
+    if chart_type == "Bar Chart":
+        fig = go.Figure(go.Bar(
+            x=brand_awareness.values,
+            y=brand_awareness.index,
+            orientation='h',
+            marker_color=_cycle(BRAND_COLORS, len(brand_awareness))
+        ))
+        fig.update_layout(showlegend=False, xaxis_title="Mentions", yaxis_title="")
+    else:
+        fig = px.pie(
+            values=brand_awareness.values,
+            names=brand_awareness.index,
+            color_discrete_sequence=BRAND_COLORS,
+            hole=0.3
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(show_spinner=False)
+def performance_fig(all_scores):
+    """Grouped bar of every score category per network, built in one go.Figure call"""
+    categories = ['Overall Experience', 'Customer Service', 'Communication', 'Pricing']
+    network_colors = {'Orange': '#FF6B6B', 'Mascom': '#4ECDC4', 'BTC': '#45B7D1'}
     
-    return scores
+    return go.Figure(
+        data=[
+            go.Bar(
+                name=network,
+                x=categories,
+                y=[all_scores[network][cat] for cat in categories],
+                text=[round(all_scores[network][cat], 2) for cat in categories],
+                textposition='outside',
+                marker_color=network_colors[network]
+            )
+            for network in NETWORKS
+        ],
+        layout=dict(
+            barmode='group',
+            height=450,
+            yaxis=dict(range=[0, 10], title='Score (out of 10)'),
+            xaxis_title='',
+            legend_title='Network',
+            uniformtext_minsize=8,
+            uniformtext_mode='hide'
+        )
+    )
 
-def main():
-    # Header
-    st.markdown('<p class="main-header">📱 Botswana Network Dashboard</p>', unsafe_allow_html=True)
-    st.markdown('<p class="sub-header">Real customer insights • 788 verified reviews • Updated 2025</p>', unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def ranked_bar_fig(counts, value, scale):
+    """Horizontal bar of the top answers (complaints / wanted features)"""
+    fig = go.Figure(go.Bar(
+        x=counts.values,
+        y=counts.index,
+        orientation='h',
+        marker=dict(color=counts.values, colorscale=scale),
+        text=counts.values,
+        textposition='outside'
+    ))
+    fig.update_layout(showlegend=False, xaxis_title=value, yaxis_title="", height=400,
+                      hovermode=False, uirevision="keep")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def choice_factors_fig(choice_factors, users):
+    """Share of a network's users citing each choice factor, as one bar chart"""
+    pct = choice_factors.values / users * 100
+    fig = go.Figure(go.Bar(
+        x=pct,
+        y=choice_factors.index,
+        orientation='h',
+        customdata=choice_factors.values,
+        texttemplate='%{customdata} users (%{x:.1f}%)',
+        textposition='auto',
+        marker_color='#667eea'
+    ))
+    fig.update_layout(
+        xaxis=dict(range=[0, 100], title="Users (%)"),
+        yaxis=dict(autorange='reversed', title=""),
+        height=60 + 45 * len(choice_factors),
+        margin=dict(t=10, b=10),
+        hovermode=False
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def churn_fig(churned, chart_type):
+    """Networks users stopped using, as a bar or pie chart"""
+    if chart_type == "Bar Chart":
+        fig = go.Figure(go.Bar(
+            x=churned.index,
+            y=churned.values,
+            marker=dict(color=churned.values, colorscale='Blues')
+        ))
+        fig.update_layout(xaxis_title="Network", yaxis_title="Users Who Left", showlegend=False)
+    else:
+        fig = px.pie(
+            values=churned.values,
+            names=churned.index,
+            color_discrete_sequence=px.colors.sequential.Blues_r,
+            hole=0.3
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(show_spinner=False)
+def loyalty_fig(loyalty):
+    """Length of use on the primary network"""
+    return px.pie(
+        values=loyalty.values,
+        names=loyalty.index,
+        color_discrete_sequence=px.colors.sequential.Blues
+    )
+
+@st.cache_data(show_spinner=False)
+def age_fig(age_dist, chart_type):
+    """Age distribution as a bar or pie chart"""
+    if chart_type == "Bar Chart":
+        fig = go.Figure(go.Bar(x=age_dist.index, y=age_dist.values))
+        fig.update_layout(title="Age Distribution", xaxis_title="Age Group", yaxis_title="Users", showlegend=False)
+    else:
+        fig = px.pie(values=age_dist.values, names=age_dist.index, title="Age Distribution",
+                     color_discrete_sequence=px.colors.qualitative.Pastel)
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(show_spinner=False)
+def employment_fig(employment, chart_type):
+    """Employment status as a pie or bar chart"""
+    if chart_type == "Pie Chart":
+        fig = px.pie(values=employment.values, names=employment.index, title="Employment Status")
+    else:
+        fig = go.Figure(go.Bar(x=employment.values, y=employment.index, orientation='h',
+                               marker=dict(color=employment.values, colorscale='Purples')))
+        fig.update_layout(title="Employment Status", showlegend=False, xaxis_title="Users", yaxis_title="")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def income_fig(income, chart_type):
+    """Monthly income levels as a bar or pie chart"""
+    if chart_type == "Bar Chart":
+        fig = go.Figure(go.Bar(x=income.values, y=income.index, orientation='h'))
+        fig.update_layout(title="Income Levels", xaxis_title="Users", yaxis_title="", showlegend=False)
+    else:
+        fig = px.pie(values=income.values, names=income.index, title="Income Levels",
+                     color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+def render_overview(filtered_df, filter_key):
+    """Market overview: headline metrics, market share and brand awareness"""
+    st.header("Market Overview")
     
-    # Load data
-    df = load_data()
+    col1, col2, col3, col4 = st.columns(4)
     
-    # Sidebar filters
-    st.sidebar.header("🔍 Filter Options")
-    st.sidebar.caption("Filters start empty — select to narrow results.")
+    with col1:
+        st.metric("Total Responses", f"{len(filtered_df):,}")
+    with col2:
+        avg_satisfaction = filtered_df['A36A_Experience_overall_experience'].mean()
+        if pd.isna(avg_satisfaction):
+            st.metric("Avg. Satisfaction", "N/A")
+        else:
+            st.metric("Avg. Satisfaction", f"{avg_satisfaction:.1f}/10")
+    with col3:
+        if len(filtered_df) > 0 and not filtered_df['A5_Primary_Mobile_Network'].mode().empty:
+            dominant_network = filtered_df['A5_Primary_Mobile_Network'].mode()[0]
+            st.metric("Market Leader", dominant_network)
+        else:
+            st.metric("Market Leader", "N/A")
+    with col4:
+        btc_churn = int(filtered_df['_has_btc_churn'].sum())
+        st.metric("BTC Churn Rate", f"{btc_churn} users")
     
-    # Age filter — starts empty so user chooses
-    age_groups = df['D1_Age'].dropna().unique().tolist()
-    selected_age = st.sidebar.multiselect("Age Group", sorted(age_groups), default=[])
+    st.markdown("---")
     
-    # Income filter — starts empty
-    income_levels = df['D7_Monthly_Income_Allowance'].dropna().unique().tolist()
-    selected_income = st.sidebar.multiselect("Income Level", income_levels, default=[])
-    
-    # Location filter — starts empty, uses normalized city names
-    locations = sorted(df['D3_Location_Botswana'].dropna().unique().tolist())
-    selected_location = st.sidebar.multiselect("Location", locations, default=[])
+    # Market share visualization
+    col1, col2 = st.columns(2)
     
-    # Apply filters — if a filter is empty, don't restrict on that dimension
-    filtered_df = df.copy()
-    if selected_age:
-        filtered_df = filtered_df[filtered_df['D1_Age'].isin(selected_age)]
-    if selected_income:
-        filtered_df = filtered_df[filtered_df['D7_Monthly_Income_Allowance'].isin(selected_income)]
-    if selected_location:
-        filtered_df = filtered_df[filtered_df['D3_Location_Botswana'].isin(selected_location)]
+    with col1:
+        st.subheader("Primary Network Market Share")
+        chart_type_ms = st.radio("Display as:", ["Pie Chart", "Bar Chart"], horizontal=True, key="market_share_chart_type")
+        market_share = count_values(filtered_df['A5_Primary_Mobile_Network'])
+        fig = market_share_fig(market_share, chart_type_ms)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
-    st.sidebar.info(f"Showing {len(filtered_df)} responses")
+    with col2:
+        st.subheader("Top of Mind Brand Awareness")
+        chart_type_ba = st.radio("Display as:", ["Bar Chart", "Pie Chart"], horizontal=True, key="brand_awareness_chart_type")
+        brand_awareness = count_values(filtered_df['A1_Top_of_Mind_Brand'])
+        fig = brand_awareness_fig(brand_awareness, chart_type_ba)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+def render_comparison(filtered_df, filter_key):
+    """Head-to-head scores for the three networks"""
+    all_scores = compute_all_network_scores(filtered_df, filter_key)
     
-    # Check if filtered data is empty
-    if len(filtered_df) == 0:
-        st.error("⚠️ No data matches your filters. Please adjust your selections.")
-        st.stop()
+    st.header("Network Head-to-Head Comparison")
     
-    # Main tabs
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "🏆 Network Comparison", "💭 Customer Insights", "📈 Market Analysis", "🎯 Recommendations"])
+    # Display comparison cards
+    cols = st.columns(3)
     
-    with tab1:
-        st.header("Market Overview")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Total Responses", f"{len(filtered_df):,}")
-        with col2:
-            avg_satisfaction = filtered_df['A36A_Experience_overall_experience'].mean()
-            if pd.isna(avg_satisfaction):
-                st.metric("Avg. Satisfaction", "N/A")
-            else:
-                st.metric("Avg. Satisfaction", f"{avg_satisfaction:.1f}/10")
-        with col3:
-            if len(filtered_df) > 0 and not filtered_df['A5_Primary_Mobile_Network'].mode().empty:
-                dominant_network = filtered_df['A5_Primary_Mobile_Network'].mode()[0]
-                st.metric("Market Leader", dominant_network)
+    for idx, network in enumerate(NETWORKS):
+        with cols[idx]:
+            scores = all_scores[network]
+            
+            # Color coding based on performance
+            if network == 'BTC':
+                color = "#45B7D1"
+            elif network == 'Orange':
+                color = "#FF6B6B"
             else:
-                st.metric("Market Leader", "N/A")
-        with col4:
-            btc_churn = len(filtered_df[filtered_df['A3_Networks_Stopped_Using'].str.contains('BTC', na=False)])
-            st.metric("BTC Churn Rate", f"{btc_churn} users")
-        
-        st.markdown("---")
+                color = "#4ECDC4"
+            
+            st.markdown(f"""
+            <div style="background: {color}; padding: 20px; border-radius: 10px; color: white;">
+                <h2 style="margin: 0; text-align: center;">{network}</h2>
+                <h3 style="margin: 10px 0; text-align: center;">{scores['Overall Experience']:.2f}/10</h3>
+                <p style="margin: 0; text-align: center; font-size: 0.9em;">{scores['Users']} users</p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            st.metric("Customer Service", f"{scores['Customer Service']:.2f}/10")
+            st.metric("Pricing", f"{scores['Pricing']:.2f}/10")
+            st.metric("Communication", f"{scores['Communication']:.2f}/10")
+    
+    st.markdown("---")
+    
+    # Grouped bar chart — replaces the radar (which was unclear when overlapping)
+    st.subheader("📊 Performance Comparison — All Networks")
+    st.caption("Scores out of 10 based on real customer ratings")
+    
+    fig_bar = performance_fig(all_scores)
+    
+    st.plotly_chart(fig_bar, use_container_width=True, config=PLOTLY_CONFIG)
+
+def render_insights(filtered_df, filter_key):
+    """Complaints, wants and likes, overall or for one network"""
+    st.header("Customer Voice: What They Really Think")
+    
+    # Add network selector
+    st.markdown("### 🔍 Select Network to Analyze")
+    selected_network = st.radio(
+        "Choose a network:",
+        ['All Networks', 'Orange', 'Mascom', 'BTC'],
+        horizontal=True
+    )
+    
+    st.markdown("---")
+    
+    # Per-network top answers, shared by the summary cards and the comparison table
+    highlights = network_highlights(filtered_df, filter_key)
+    
+    if selected_network == 'All Networks':
+        # Overall view
+        st.subheader("📊 Overall Market Insights (All Networks)")
         
-        # Market share visualization
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("Primary Network Market Share")
-            chart_type_ms = st.radio("Display as:", ["Pie Chart", "Bar Chart"], horizontal=True, key="market_share_chart_type")
-            market_share = filtered_df['A5_Primary_Mobile_Network'].value_counts()
-            if chart_type_ms == "Pie Chart":
-                fig = px.pie(
-                    values=market_share.values,
-                    names=market_share.index,
-                    color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'],
-                    hole=0.4
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
+            st.markdown("#### 😤 Top Complaints Across All Networks")
+            complaints = count_values(filtered_df['A12_Most_Disliked_Feature'], 8)
+            
+            if len(complaints) > 0:
+                fig = ranked_bar_fig(complaints, 'Mentions', 'Reds')
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             else:
-                ms_data = pd.DataFrame({'Network': market_share.index.tolist(), 'Users': market_share.values.tolist()})
-                fig = px.bar(ms_data, x='Network', y='Users', color='Network',
-                             color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'],
-                             text='Users')
-                fig.update_traces(textposition='outside')
-                fig.update_layout(showlegend=False, xaxis_title="Network", yaxis_title="Number of Users")
-            st.plotly_chart(fig, use_container_width=True)
+                st.info("No complaint data available")
         
         with col2:
-            st.subheader("Top of Mind Brand Awareness")
-            chart_type_ba = st.radio("Display as:", ["Bar Chart", "Pie Chart"], horizontal=True, key="brand_awareness_chart_type")
-            brand_awareness = filtered_df['A1_Top_of_Mind_Brand'].value_counts()
-            
-            bar_data = pd.DataFrame({
-                'Brand': brand_awareness.index.tolist(),
-                'Mentions': brand_awareness.values.tolist()
-            })
+            st.markdown("#### 💡 Most Wanted Features Across All Networks")
+            desires = top_tokens(filtered_df['A22_Desired_Value_Added_Services'], 8)
             
-            if chart_type_ba == "Bar Chart":
-                fig = px.bar(
-                    bar_data,
-                    x='Mentions',
-                    y='Brand',
-                    orientation='h',
-                    color='Brand',
-                    color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1']
-                )
-                fig.update_layout(showlegend=False, xaxis_title="Mentions", yaxis_title="")
+            if len(desires) > 0:
+                fig = ranked_bar_fig(desires, 'Requests', 'Greens')
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             else:
-                fig = px.pie(
-                    bar_data,
-                    values='Mentions',
-                    names='Brand',
-                    color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'],
-                    hole=0.3
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-    
-    with tab2:
-        st.header("Network Head-to-Head Comparison")
+                st.info("No feature request data available")
         
-        # Calculate scores for each network
-        networks = ['Orange', 'Mascom', 'BTC']
-        all_scores = {}
-        
-        for network in networks:
-            all_scores[network] = calculate_network_scores(filtered_df, network)
+        st.markdown("---")
+        st.markdown("#### 📋 Quick Summary by Network")
         
-        # Display comparison cards
+        # Summary cards for each network
         cols = st.columns(3)
-        
-        for idx, network in enumerate(networks):
+        for idx, network in enumerate(NETWORKS):
             with cols[idx]:
-                scores = all_scores[network]
+                top = highlights[network]
                 
-                # Color coding based on performance
-                if network == 'BTC':
-                    color = "#45B7D1"
-                elif network == 'Orange':
-                    color = "#FF6B6B"
+                if top['users'] > 0:
+                    st.markdown(f"**{network}** ({top['users']} users)")
+                    
+                    if top['complaint']:
+                        st.markdown(f"😤 **Top Complaint:**")
+                        st.caption(f"{top['complaint'][0]} ({top['complaint'][1]})")
+                    
+                    if top['want']:
+                        st.markdown(f"💡 **Top Want:**")
+                        st.caption(f"{top['want'][0]} ({top['want'][1]})")
                 else:
-                    color = "#4ECDC4"
-                
-                st.markdown(f"""
-                <div style="background: {color}; padding: 20px; border-radius: 10px; color: white;">
-                    <h2 style="margin: 0; text-align: center;">{network}</h2>
-                    <h3 style="margin: 10px 0; text-align: center;">{scores['Overall Experience']:.2f}/10</h3>
-                    <p style="margin: 0; text-align: center; font-size: 0.9em;">{scores['Users']} users</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-                
-                st.metric("Customer Service", f"{scores['Customer Service']:.2f}/10")
-                st.metric("Pricing", f"{scores['Pricing']:.2f}/10")
-                st.metric("Communication", f"{scores['Communication']:.2f}/10")
-        
-        st.markdown("---")
-        
-        # Grouped bar chart — replaces the radar (which was unclear when overlapping)
-        st.subheader("📊 Performance Comparison — All Networks")
-        st.caption("Scores out of 10 based on real customer ratings")
-        
-        categories = ['Overall Experience', 'Customer Service', 'Communication', 'Pricing']
-        
-        perf_rows = []
-        for network in networks:
-            scores = all_scores[network]
-            for cat in categories:
-                perf_rows.append({
-                    'Network': network,
-                    'Category': cat,
-                    'Score': scores[cat]
-                })
-        
-        perf_df = pd.DataFrame(perf_rows)
-        
-        fig_bar = px.bar(
-            perf_df,
-            x='Category',
-            y='Score',
-            color='Network',
-            barmode='group',
-            color_discrete_map={'Orange': '#FF6B6B', 'Mascom': '#4ECDC4', 'BTC': '#45B7D1'},
-            text=perf_df['Score'].round(2),
-            height=450
-        )
-        fig_bar.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_bar.update_layout(
-            yaxis=dict(range=[0, 10], title='Score (out of 10)'),
-            xaxis_title='',
-            legend_title='Network',
-            uniformtext_minsize=8,
-            uniformtext_mode='hide'
-        )
-        
-        st.plotly_chart(fig_bar, use_container_width=True)
+                    st.info(f"No data for {network}")
     
-    with tab3:
-        st.header("Customer Voice: What They Really Think")
-        
-        # Add network selector
-        st.markdown("### 🔍 Select Network to Analyze")
-        selected_network = st.radio(
-            "Choose a network:",
-            ['All Networks', 'Orange', 'Mascom', 'BTC'],
-            horizontal=True
-        )
-        
-        st.markdown("---")
+    else:
+        # Network-specific view
+        network_df = split_by_network(filtered_df)[selected_network]
         
-        if selected_network == 'All Networks':
-            # Overall view
-            st.subheader("📊 Overall Market Insights (All Networks)")
+        if len(network_df) == 0:
+            st.warning(f"No data available for {selected_network} with current filters.")
+        else:
+            # Network header with stats
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Users", f"{len(network_df)}")
+            with col2:
+                avg_satisfaction = network_df['A36A_Experience_overall_experience'].mean()
+                st.metric("Avg. Satisfaction", f"{avg_satisfaction:.1f}/10" if not pd.isna(avg_satisfaction) else "N/A")
+            with col3:
+                market_share = (len(network_df) / len(filtered_df)) * 100
+                st.metric("Market Share", f"{market_share:.1f}%")
+            with col4:
+                avg_service = network_df['A36B_Experience_Customer_Service'].mean()
+                st.metric("Customer Service", f"{avg_service:.1f}/10" if not pd.isna(avg_service) else "N/A")
             
+            st.markdown("---")
+            
+            # Complaints and Desires side by side
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown("#### 😤 Top Complaints Across All Networks")
-                complaints = filtered_df['A12_Most_Disliked_Feature'].value_counts().head(8)
+                st.markdown(f"#### 😤 What {selected_network} Customers Complain About")
+                complaints = count_values(network_df['A12_Most_Disliked_Feature'], 8)
                 
                 if len(complaints) > 0:
-                    complaints_data = pd.DataFrame({
-                        'Complaint': complaints.index.tolist(),
-                        'Mentions': complaints.values.tolist()
-                    })
+                    fig = ranked_bar_fig(complaints, 'Mentions', 'Reds')
+                    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
                     
-                    fig = px.bar(
-                        complaints_data,
-                        x='Mentions',
-                        y='Complaint',
-                        orientation='h',
-                        color='Mentions',
-                        color_continuous_scale='Reds',
-                        text='Mentions'
-                    )
-                    fig.update_traces(textposition='outside')
-                    fig.update_layout(showlegend=False, xaxis_title="Mentions", yaxis_title="", height=400)
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Show percentage
+                    st.caption(f"Based on {len(network_df)} {selected_network} users")
                 else:
                     st.info("No complaint data available")
             
             with col2:
-                st.markdown("#### 💡 Most Wanted Features Across All Networks")
-                desires = filtered_df['A22_Desired_Value_Added_Services'].str.split(',').explode().str.strip().value_counts().head(8)
+                st.markdown(f"#### 💡 What {selected_network} Customers Want")
+                desires = top_tokens(network_df['A22_Desired_Value_Added_Services'], 8)
                 
                 if len(desires) > 0:
-                    desires_data = pd.DataFrame({
-                        'Feature': desires.index.tolist(),
-                        'Requests': desires.values.tolist()
-                    })
+                    fig = ranked_bar_fig(desires, 'Requests', 'Greens')
+                    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
                     
-                    fig = px.bar(
-                        desires_data,
-                        x='Requests',
-                        y='Feature',
-                        orientation='h',
-                        color='Requests',
-                        color_continuous_scale='Greens',
-                        text='Requests'
-                    )
-                    fig.update_traces(textposition='outside')
-                    fig.update_layout(showlegend=False, xaxis_title="Requests", yaxis_title="", height=400)
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(f"Based on {len(network_df)} {selected_network} users")
                 else:
                     st.info("No feature request data available")
             
             st.markdown("---")
-            st.markdown("#### 📋 Quick Summary by Network")
             
-            # Summary cards for each network
-            cols = st.columns(3)
-            for idx, network in enumerate(['Orange', 'Mascom', 'BTC']):
-                with cols[idx]:
-                    network_df = filtered_df[filtered_df['A5_Primary_Mobile_Network'] == network]
-                    
-                    if len(network_df) > 0:
-                        top_complaint = network_df['A12_Most_Disliked_Feature'].value_counts().head(1)
-                        top_desire = network_df['A22_Desired_Value_Added_Services'].str.split(',').explode().str.strip().value_counts().head(1)
-                        
-                        st.markdown(f"**{network}** ({len(network_df)} users)")
-                        
-                        if len(top_complaint) > 0:
-                            st.markdown(f"😤 **Top Complaint:**")
-                            st.caption(f"{top_complaint.index[0]} ({top_complaint.values[0]})")
-                        
-                        if len(top_desire) > 0:
-                            st.markdown(f"💡 **Top Want:**")
-                            st.caption(f"{top_desire.index[0]} ({top_desire.values[0]})")
-                    else:
-                        st.info(f"No data for {network}")
-        
-        else:
-            # Network-specific view
-            network_df = filtered_df[filtered_df['A5_Primary_Mobile_Network'] == selected_network]
+            # What they like vs dislike
+            st.markdown(f"#### ✅ What {selected_network} Users LOVE vs ❌ What They HATE")
             
-            if len(network_df) == 0:
-                st.warning(f"No data available for {selected_network} with current filters.")
-            else:
-                # Network header with stats
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Users", f"{len(network_df)}")
-                with col2:
-                    avg_satisfaction = network_df['A36A_Experience_overall_experience'].mean()
-                    st.metric("Avg. Satisfaction", f"{avg_satisfaction:.1f}/10" if not pd.isna(avg_satisfaction) else "N/A")
-                with col3:
-                    market_share = (len(network_df) / len(filtered_df)) * 100
-                    st.metric("Market Share", f"{market_share:.1f}%")
-                with col4:
-                    avg_service = network_df['A36B_Experience_Customer_Service'].mean()
-                    st.metric("Customer Service", f"{avg_service:.1f}/10" if not pd.isna(avg_service) else "N/A")
-                
-                st.markdown("---")
-                
-                # Complaints and Desires side by side
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown(f"#### 😤 What {selected_network} Customers Complain About")
-                    complaints = network_df['A12_Most_Disliked_Feature'].value_counts().head(8)
-                    
-                    if len(complaints) > 0:
-                        complaints_data = pd.DataFrame({
-                            'Complaint': complaints.index.tolist(),
-                            'Mentions': complaints.values.tolist()
-                        })
-                        
-                        fig = px.bar(
-                            complaints_data,
-                            x='Mentions',
-                            y='Complaint',
-                            orientation='h',
-                            color='Mentions',
-                            color_continuous_scale='Reds',
-                            text='Mentions'
-                        )
-                        fig.update_traces(textposition='outside')
-                        fig.update_layout(showlegend=False, xaxis_title="Mentions", yaxis_title="", height=400)
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Show percentage
-                        st.caption(f"Based on {len(network_df)} {selected_network} users")
-                    else:
-                        st.info("No complaint data available")
-                
-                with col2:
-                    st.markdown(f"#### 💡 What {selected_network} Customers Want")
-                    desires = network_df['A22_Desired_Value_Added_Services'].str.split(',').explode().str.strip().value_counts().head(8)
-                    
-                    if len(desires) > 0:
-                        desires_data = pd.DataFrame({
-                            'Feature': desires.index.tolist(),
-                            'Requests': desires.values.tolist()
-                        })
-                        
-                        fig = px.bar(
-                            desires_data,
-                            x='Requests',
-                            y='Feature',
-                            orientation='h',
-                            color='Requests',
-                            color_continuous_scale='Greens',
-                            text='Requests'
-                        )
-                        fig.update_traces(textposition='outside')
-                        fig.update_layout(showlegend=False, xaxis_title="Requests", yaxis_title="", height=400)
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        st.caption(f"Based on {len(network_df)} {selected_network} users")
-                    else:
-                        st.info("No feature request data available")
-                
-                st.markdown("---")
-                
-                # What they like vs dislike
-                st.markdown(f"#### ✅ What {selected_network} Users LOVE vs ❌ What They HATE")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("**Most Liked Features:**")
-                    liked = network_df['A11_Most_Liked_Feature'].value_counts().head(5)
-                    if len(liked) > 0:
-                        for feature, count in liked.items():
-                            st.write(f"✅ **{feature}**: {count} mentions")
-                    else:
-                        st.info("No data")
-                
-                with col2:
-                    st.markdown("**Priority Improvements Needed:**")
-                    improvements = network_df['A24_Improvement_Areas_Primary_Network'].str.split(',').explode().str.strip().value_counts().head(5)
-                    if len(improvements) > 0:
-                        for improvement, count in improvements.items():
-                            st.write(f"🔧 **{improvement}**: {count} mentions")
-                    else:
-                        st.info("No data")
-                
-                st.markdown("---")
-                
-                # Competitive insights
-                st.markdown(f"#### 🎯 Why Users Chose {selected_network}")
-                choice_factors = network_df['A6_Factors_Influencing_Choice'].str.split(',').explode().str.strip().value_counts().head(5)
-                
-                if len(choice_factors) > 0:
-                    for factor, count in choice_factors.items():
-                        percentage = (count / len(network_df)) * 100
-                        st.progress(percentage / 100)
-                        st.caption(f"{factor}: {count} users ({percentage:.1f}%)")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("**Most Liked Features:**")
+                liked = count_values(network_df['A11_Most_Liked_Feature'], 5)
+                if len(liked) > 0:
+                    for feature, count in liked.items():
+                        st.write(f"✅ **{feature}**: {count} mentions")
                 else:
-                    st.info("No data on choice factors")
-        
-        st.markdown("---")
-        
-        # Comparison view - always show
-        st.subheader("📊 Network-by-Network Comparison")
-        
-        comparison_metrics = {}
-        for network in ['Orange', 'Mascom', 'BTC']:
-            network_df = filtered_df[filtered_df['A5_Primary_Mobile_Network'] == network]
+                    st.info("No data")
             
-            if len(network_df) > 0:
-                top_complaint = network_df['A12_Most_Disliked_Feature'].value_counts().head(1)
-                top_desire = network_df['A22_Desired_Value_Added_Services'].str.split(',').explode().str.strip().value_counts().head(1)
-                top_strength = network_df['A11_Most_Liked_Feature'].value_counts().head(1)
-                
-                comparison_metrics[network] = {
-                    'Users': len(network_df),
-                    'Top Complaint': top_complaint.index[0] if len(top_complaint) > 0 else 'N/A',
-                    'Complaint Count': top_complaint.values[0] if len(top_complaint) > 0 else 0,
-                    'Top Want': top_desire.index[0] if len(top_desire) > 0 else 'N/A',
-                    'Want Count': top_desire.values[0] if len(top_desire) > 0 else 0,
-                    'Top Strength': top_strength.index[0] if len(top_strength) > 0 else 'N/A'
-                }
-        
-        if comparison_metrics:
-            comparison_df = pd.DataFrame(comparison_metrics).T
-            st.dataframe(comparison_df, use_container_width=True)
-        else:
-            st.info("No comparison data available with current filters")
-    
-    with tab4:
-        st.header("Market Trends & Churn Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Network Abandonment")
-            churned = filtered_df['A3_Networks_Stopped_Using'].value_counts().head(5)
+            with col2:
+                st.markdown("**Priority Improvements Needed:**")
+                improvements = top_tokens(network_df['A24_Improvement_Areas_Primary_Network'], 5)
+                if len(improvements) > 0:
+                    for improvement, count in improvements.items():
+                        st.write(f"🔧 **{improvement}**: {count} mentions")
+                else:
+                    st.info("No data")
             
-            chart_type_churn = st.radio("Display as:", ["Bar Chart", "Pie Chart"], horizontal=True, key="churn_chart_type")
+            st.markdown("---")
             
-            # Create DataFrame for churned networks
-            churned_data = pd.DataFrame({
-                'Network': churned.index.tolist(),
-                'Users': churned.values.tolist()
-            })
+            # Competitive insights
+            st.markdown(f"#### 🎯 Why Users Chose {selected_network}")
+            choice_factors = top_tokens(network_df['A6_Factors_Influencing_Choice'], 5)
             
-            if chart_type_churn == "Bar Chart":
-                fig = px.bar(
-                    churned_data,
-                    x='Network',
-                    y='Users',
-                    color='Users',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_layout(xaxis_title="Network", yaxis_title="Users Who Left", showlegend=False)
+            if len(choice_factors) > 0:
+                fig = choice_factors_fig(choice_factors, len(network_df))
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             else:
-                fig = px.pie(
-                    churned_data,
-                    values='Users',
-                    names='Network',
-                    color_discrete_sequence=px.colors.sequential.Blues_r,
-                    hole=0.3
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
+                st.info("No data on choice factors")
+    
+    st.markdown("---")
+    
+    # Comparison view - always show
+    st.subheader("📊 Network-by-Network Comparison")
+    
+    comparison_metrics = {}
+    for network, top in highlights.items():
+        if top['users'] > 0:
+            complaint, complaint_count = top['complaint'] or ('N/A', 0)
+            want, want_count = top['want'] or ('N/A', 0)
+            strength, _ = top['strength'] or ('N/A', 0)
             
-            if len(churned) > 0:
-                st.info(f"💡 **Key Insight**: {churned.index[0]} has the highest churn rate with {churned.iloc[0]} users abandoning the network")
-            else:
-                st.info("💡 **Key Insight**: No churn data available with current filters")
-        
-        with col2:
-            st.subheader("Customer Loyalty (Length of Use)")
-            loyalty = filtered_df['A9_How_Long_Primary_Network'].value_counts()
-            fig = px.pie(
-                values=loyalty.values,
-                names=loyalty.index,
-                color_discrete_sequence=px.colors.sequential.Blues
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Demographics
-        st.markdown("---")
-        st.subheader("User Demographics")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            age_dist = filtered_df['D1_Age'].value_counts()
-            age_data = pd.DataFrame({
-                'Age Group': age_dist.index.tolist(),
-                'Users': age_dist.values.tolist()
-            })
-            chart_type_age = st.radio("Age Chart:", ["Bar Chart", "Pie Chart"], horizontal=True, key="age_chart_type")
-            if chart_type_age == "Bar Chart":
-                fig = px.bar(age_data, x='Age Group', y='Users', title="Age Distribution")
-                fig.update_layout(xaxis_title="Age Group", yaxis_title="Users", showlegend=False)
-            else:
-                fig = px.pie(age_data, values='Users', names='Age Group', title="Age Distribution",
-                             color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            employment = filtered_df['D5_Employment_Status'].value_counts()
-            chart_type_emp = st.radio("Employment Chart:", ["Pie Chart", "Bar Chart"], horizontal=True, key="emp_chart_type")
-            emp_data = pd.DataFrame({'Status': employment.index.tolist(), 'Users': employment.values.tolist()})
-            if chart_type_emp == "Pie Chart":
-                fig = px.pie(values=employment.values, names=employment.index, title="Employment Status")
-            else:
-                fig = px.bar(emp_data, x='Users', y='Status', orientation='h', title="Employment Status",
-                             color='Users', color_continuous_scale='Purples')
-                fig.update_layout(showlegend=False, xaxis_title="Users", yaxis_title="")
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col3:
-            income = filtered_df['D7_Monthly_Income_Allowance'].value_counts()
-            income_data = pd.DataFrame({
-                'Income Level': income.index.tolist(),
-                'Users': income.values.tolist()
-            })
-            chart_type_inc = st.radio("Income Chart:", ["Bar Chart", "Pie Chart"], horizontal=True, key="income_chart_type")
-            if chart_type_inc == "Bar Chart":
-                fig = px.bar(income_data, x='Users', y='Income Level', orientation='h', title="Income Levels")
-                fig.update_layout(xaxis_title="Users", yaxis_title="", showlegend=False)
-            else:
-                fig = px.pie(income_data, values='Users', names='Income Level', title="Income Levels",
-                             color_discrete_sequence=px.colors.qualitative.Set2)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
+            comparison_metrics[network] = {
+                'Users': top['users'],
+                'Top Complaint': complaint,
+                'Complaint Count': complaint_count,
+                'Top Want': want,
+                'Want Count': want_count,
+                'Top Strength': strength
+            }
     
-    with tab5:
-        st.header("🎯 Data-Driven Recommendations")
-        
-        st.subheader("For Consumers: Which Network Should You Choose?")
-        
-        # Recommendation engine
-        col1, col2 = st.columns(2)
+    if comparison_metrics:
+        comparison_df = pd.DataFrame(comparison_metrics).T
+        st.dataframe(comparison_df, use_container_width=True)
+    else:
+        st.info("No comparison data available with current filters")
+
+def render_market(filtered_df, filter_key):
+    """Churn, loyalty and demographics"""
+    st.header("Market Trends & Churn Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Network Abandonment")
+        churned = count_values(filtered_df['A3_Networks_Stopped_Using'], 5)
         
-        with col1:
-            priority = st.selectbox(
-                "What matters most to you?",
-                ["Overall Satisfaction", "Best Customer Service", "Best Value for Money", "Fastest Internet", "Most Reliable"]
-            )
+        chart_type_churn = st.radio("Display as:", ["Bar Chart", "Pie Chart"], horizontal=True, key="churn_chart_type")
         
-        with col2:
-            budget = st.selectbox(
-                "Your budget?",
-                ["Budget-conscious", "Mid-range", "Premium"]
-            )
-        
-        if st.button("Get Recommendation", type="primary"):
-            st.markdown("---")
-            
-            if priority == "Overall Satisfaction":
-                st.success("### Recommended: BTC")
-                st.write("- Highest overall satisfaction: 8.07/10")
-                st.write("- Best customer service: 8.02/10")
-                st.write("- Best pricing satisfaction: 7.88/10")
-            elif priority == "Best Value for Money":
-                st.success("### Recommended: Mascom")
-                st.write("- Strong balance of price and quality")
-                st.write("- Wide network coverage")
-                st.write("- Popular choice among students")
-            else:
-                st.success("### Recommended: Orange")
-                st.write("- Fastest internet speeds")
-                st.write("- Modern infrastructure")
-                st.write("- Good for data-heavy users")
+        fig = churn_fig(churned, chart_type_churn)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
+        if len(churned) > 0:
+            st.info(f"💡 **Key Insight**: {churned.index[0]} has the highest churn rate with {churned.iloc[0]} users abandoning the network")
+        else:
+            st.info("💡 **Key Insight**: No churn data available with current filters")
+    
+    with col2:
+        st.subheader("Customer Loyalty (Length of Use)")
+        loyalty = count_values(filtered_df['A9_How_Long_Primary_Network'])
+        fig = loyalty_fig(loyalty)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    
+    # Demographics
+    st.markdown("---")
+    st.subheader("User Demographics")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        age_dist = count_values(filtered_df['D1_Age'])
+        chart_type_age = st.radio("Age Chart:", ["Bar Chart", "Pie Chart"], horizontal=True, key="age_chart_type")
+        fig = age_fig(age_dist, chart_type_age)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    
+    with col2:
+        employment = count_values(filtered_df['D5_Employment_Status'])
+        chart_type_emp = st.radio("Employment Chart:", ["Pie Chart", "Bar Chart"], horizontal=True, key="emp_chart_type")
+        fig = employment_fig(employment, chart_type_emp)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    
+    with col3:
+        income = count_values(filtered_df['D7_Monthly_Income_Allowance'])
+        chart_type_inc = st.radio("Income Chart:", ["Bar Chart", "Pie Chart"], horizontal=True, key="income_chart_type")
+        fig = income_fig(income, chart_type_inc)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+# Consumer priority → (recommended network, supporting points); anything else gets Orange
+RECOMMENDATIONS = {
+    "Overall Satisfaction": ("BTC", [
+        "Highest overall satisfaction: 8.07/10",
+        "Best customer service: 8.02/10",
+        "Best pricing satisfaction: 7.88/10",
+    ]),
+    "Best Value for Money": ("Mascom", [
+        "Strong balance of price and quality",
+        "Wide network coverage",
+        "Popular choice among students",
+    ]),
+}
+DEFAULT_RECOMMENDATION = ("Orange", [
+    "Fastest internet speeds",
+    "Modern infrastructure",
+    "Good for data-heavy users",
+])
+
+@st.fragment
+def recommendation_engine():
+    """
+    Priority/budget pickers and the recommendation they lead to
+    A fragment, so picking options reruns only this block; the last answer is kept in session_state
+    """
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        priority = st.selectbox(
+            "What matters most to you?",
+            ["Overall Satisfaction", "Best Customer Service", "Best Value for Money", "Fastest Internet", "Most Reliable"]
+        )
+    
+    with col2:
+        budget = st.selectbox(
+            "Your budget?",
+            ["Budget-conscious", "Mid-range", "Premium"]
+        )
+    
+    if st.button("Get Recommendation", type="primary"):
+        st.session_state.rec = priority
+    
+    if 'rec' in st.session_state:
         st.markdown("---")
         
-        st.subheader("For Network Providers: Strategic Improvements")
-        
-        with st.expander("🟠 Orange Botswana"):
-            st.markdown("""
-            **Priority Actions:**
-            1. **Reduce data prices** - #1 complaint (160 mentions)
-            2. **Improve customer service** - Currently 6.97/10 (lowest)
-            3. **Introduce loyalty programs** - 126 customers want this
-            4. **Offer unlimited data plans** - 182 requests
-            
-            **Opportunity:** You have the fastest network, but pricing is holding you back
-            """)
-        
-        with st.expander("🔵 Mascom"):
-            st.markdown("""
-            **Priority Actions:**
-            1. **Improve internet speed** - 233 complaints
-            2. **More flexible data packages** - 155 requests
-            3. **Better app experience** - High app usage but frequent issues
-            4. **Transparency in billing** - Hidden charges complaint
-            
-            **Opportunity:** You're the market leader, focus on maintaining quality
-            """)
-        
-        with st.expander("🟢 BTC"):
-            st.markdown("""
-            **Priority Actions:**
-            1. **Reduce churn** - 134 users left (highest churn)
-            2. **Expand market share** - Only 5.6% market share
-            3. **Maintain high satisfaction** - You score highest (8.07/10)
-            4. **Improve network coverage** - Main complaint
-            
-            **Opportunity:** High satisfaction but low awareness - invest in marketing
-            """)
+        network, points = RECOMMENDATIONS.get(st.session_state.rec, DEFAULT_RECOMMENDATION)
+        st.success(f"### Recommended: {network}")
+        for point in points:
+            st.write(f"- {point}")
+
+def render_recommendations(filtered_df, filter_key):
+    """Consumer recommendation engine and provider action plans"""
+    st.header("🎯 Data-Driven Recommendations")
+    
+    st.subheader("For Consumers: Which Network Should You Choose?")
+    
+    # Recommendation engine
+    recommendation_engine()
+    
+    st.markdown("---")
+    
+    st.subheader("For Network Providers: Strategic Improvements")
+    
+    with st.expander("🟠 Orange Botswana"):
+        st.markdown("""
+        **Priority Actions:**
+        1. **Reduce data prices** - #1 complaint (160 mentions)
+        2. **Improve customer service** - Currently 6.97/10 (lowest)
+        3. **Introduce loyalty programs** - 126 customers want this
+        4. **Offer unlimited data plans** - 182 requests
+        
+        **Opportunity:** You have the fastest network, but pricing is holding you back
+        """)
+    
+    with st.expander("🔵 Mascom"):
+        st.markdown("""
+        **Priority Actions:**
+        1. **Improve internet speed** - 233 complaints
+        2. **More flexible data packages** - 155 requests
+        3. **Better app experience** - High app usage but frequent issues
+        4. **Transparency in billing** - Hidden charges complaint
+        
+        **Opportunity:** You're the market leader, focus on maintaining quality
+        """)
+    
+    with st.expander("🟢 BTC"):
+        st.markdown("""
+        **Priority Actions:**
+        1. **Reduce churn** - 134 users left (highest churn)
+        2. **Expand market share** - Only 5.6% market share
+        3. **Maintain high satisfaction** - You score highest (8.07/10)
+        4. **Improve network coverage** - Main complaint
+        
+        **Opportunity:** High satisfaction but low awareness - invest in marketing
+        """)
+
+SECTIONS = {
+    "📊 Overview": render_overview,
+    "🏆 Network Comparison": render_comparison,
+    "💭 Customer Insights": render_insights,
+    "📈 Market Analysis": render_market,
+    "🎯 Recommendations": render_recommendations,
+}
+
+def main():
+    # Header
+    st.markdown('<p class="main-header">📱 Botswana Network Dashboard</p>', unsafe_allow_html=True)
+    st.markdown('<p class="sub-header">Real customer insights • 788 verified reviews • Updated 2025</p>', unsafe_allow_html=True)
+    
+    # Load data
+    df = load_data()
+    
+    # Sidebar filters
+    st.sidebar.header("🔍 Filter Options")
+    st.sidebar.caption("Filters start empty — select to narrow results.")
+    
+    age_groups, income_levels, locations = sidebar_options()
+    
+    # Age filter — starts empty so user chooses
+    selected_age = st.sidebar.multiselect("Age Group", age_groups, default=[])
+    
+    # Income filter — starts empty
+    selected_income = st.sidebar.multiselect("Income Level", income_levels, default=[])
+    
+    # Location filter — starts empty, uses normalized city names
+    selected_location = st.sidebar.multiselect("Location", locations, default=[])
+    
+    # Apply filters — if a filter is empty, don't restrict on that dimension
+    # (one combined mask, one selection)
+    mask = np.ones(len(df), dtype=bool)
+    if selected_age:
+        mask &= df['D1_Age'].isin(selected_age).values
+    if selected_income:
+        mask &= df['D7_Monthly_Income_Allowance'].isin(selected_income).values
+    if selected_location:
+        mask &= df['D3_Location_Botswana'].isin(selected_location).values
+    filtered_df = df if mask.all() else df.loc[mask]
+    
+    st.sidebar.info(f"Showing {len(filtered_df)} responses")
+    filter_key = (tuple(selected_age), tuple(selected_income), tuple(selected_location))
+    
+    # Check if filtered data is empty
+    if len(filtered_df) == 0:
+        st.error("⚠️ No data matches your filters. Please adjust your selections.")
+        st.stop()
+    
+    # Only the selected section runs - st.tabs would execute all five on every rerun
+    section = st.radio("Section", list(SECTIONS), horizontal=True, key="active_tab", label_visibility="collapsed")
+    SECTIONS[section](filtered_df, filter_key)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file